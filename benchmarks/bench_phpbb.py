@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""Throughput benchmark of every public ``PhpBB`` method, against ``FakeBoard``.
+
+The board runs in-process (``httpx.ASGITransport``), so numbers measure the
+library (requests, parsing, waits) plus the configured board latency.
+
+Usage::
+
+    python -m benchmarks.bench_phpbb --ops 200 --concurrency 1,4,16 --latency 0.005
+    python -m benchmarks.bench_phpbb --only fetch_unread_messages,send_private_message
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+
+from pyphpbb_sl import Message, PhpBB
+from pyphpbb_sl.fakeboard import FakeBoard
+from pyphpbb_sl.ratelimit import RateLimiter
+
+HOST = "http://board.test"
+
+
+@dataclass
+class Worker:
+    """One logged-in session, and what its operations need."""
+
+    phpbb: PhpBB
+    name: str
+    password: str
+    partner: str
+    options: dict = field(default_factory=dict)
+    messages: list[Message] = field(default_factory=list)
+
+
+async def op_login(w: Worker, i: int):
+    async with PhpBB(HOST, **w.options) as phpbb:
+        await phpbb.login(w.name, w.password)
+
+
+async def op_read(w: Worker, i: int):
+    await w.phpbb.read_private_message(w.messages[i % len(w.messages)])
+
+
+async def op_delete(w: Worker, i: int):
+    await w.phpbb.delete_mp(w.messages.pop())
+
+
+async def op_send(w: Worker, i: int):
+    await w.phpbb.send_private_message(w.partner, f"Bench {i}", "Hello from the benchmark")
+
+
+OPERATIONS: dict[str, Callable[[Worker, int], Awaitable[object]]] = {
+    "login": op_login,
+    "fetch_unread_messages": lambda w, i: w.phpbb.fetch_unread_messages(),
+    "fetch_read_messages": lambda w, i: w.phpbb.fetch_read_messages(),
+    "fetch_sent_messages": lambda w, i: w.phpbb.fetch_sent_messages(),
+    "read_private_message": op_read,
+    "send_private_message": op_send,
+    "delete_mp": op_delete,
+    "get_birthdays": lambda w, i: w.phpbb.get_birthdays(),
+    "get_member_rank": lambda w, i: w.phpbb.get_member_rank(w.partner),
+    "get_member_uid": lambda w, i: w.phpbb.get_member_uid(w.partner),
+    "get_member_infos": lambda w, i: w.phpbb.get_member_infos(w.partner),
+    "fetch_forums": lambda w, i: w.phpbb.fetch_forums(),
+}
+
+
+@dataclass
+class Result:
+    operation: str
+    concurrency: int
+    ops: int
+    elapsed: float
+    latencies: list[float]
+    requests: int
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.ops / self.elapsed
+
+    def percentile(self, p: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+
+async def bench(name: str, concurrency: int, ops: int, args: argparse.Namespace) -> Result:
+    per_worker = ops // concurrency + 1
+    board = FakeBoard.generate(
+        users=concurrency + 1,
+        messages=per_worker,
+        latency=args.latency,
+        per_page=max(per_worker, 50),
+    )
+    options = {
+        "transport": httpx.ASGITransport(app=board),
+        "rate_limiter": None if args.limited else RateLimiter.unlimited(),
+        "min_form_age": 1.0 if args.limited else 0.0,
+    }
+    workers = []
+    for n in range(concurrency):
+        phpbb = PhpBB(HOST, **options)
+        await phpbb.login(f"user{n}", f"password{n}")
+        worker = Worker(phpbb, f"user{n}", f"password{n}", f"user{n + 1}", options)
+        if name in ("read_private_message", "delete_mp"):
+            worker.messages = list(await phpbb.fetch_read_messages())
+            worker.messages += await phpbb.fetch_unread_messages()
+        workers.append(worker)
+
+    operation = OPERATIONS[name]
+    latencies: list[float] = []
+
+    async def run(worker: Worker, first: int):
+        for i in range(first, ops, concurrency):
+            start = time.perf_counter()
+            await operation(worker, i)
+            latencies.append(time.perf_counter() - start)
+
+    requests_before = board.requests
+    start = time.perf_counter()
+    await asyncio.gather(*(run(w, n) for n, w in enumerate(workers)))
+    elapsed = time.perf_counter() - start
+    requests = board.requests - requests_before
+
+    for worker in workers:
+        await worker.phpbb.__aexit__(None, None, None)
+    return Result(name, concurrency, ops, elapsed, latencies, requests)
+
+
+async def main(args: argparse.Namespace) -> None:
+    names = args.only.split(",") if args.only else list(OPERATIONS)
+    levels = [int(c) for c in args.concurrency.split(",")]
+    print(f"{'operation':<24}{'conc':>5}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'req/op':>8}")
+    for name in names:
+        for concurrency in levels:
+            r = await bench(name, concurrency, args.ops, args)
+            print(
+                f"{r.operation:<24}{r.concurrency:>5}{r.ops_per_sec:>10.1f}"
+                f"{r.percentile(50) * 1000:>10.2f}{r.percentile(99) * 1000:>10.2f}"
+                f"{r.requests / r.ops:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=100, help="operations per run")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated levels")
+    parser.add_argument("--latency", type=float, default=0.0, help="board latency (s)")
+    parser.add_argument("--only", default="", help="comma separated operations")
+    parser.add_argument(
+        "--limited", action="store_true", help="keep default rate limits and form delays"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -34,8 +34,7 @@ async def main():
         print(*unread_mess_list, sep="\n")
 
         print("\nHere are the contents of messages (messages have been marked as read) :")  # noqa: E501
-        for unread_mess in unread_mess_list:
-            message = await phpbb.read_private_message(unread_mess)
+        for message in await phpbb.read_many(unread_mess_list):
             print(message)
 
 
@@ -5,12 +5,11 @@
 import asyncio
 import logging
 import os
-import time
 from secrets import token_hex
 
 from dotenv import load_dotenv
 
-from pyphpbb_sl import PhpBB
+from pyphpbb_sl import PhpBB, UnreadWatcher
 
 logging.basicConfig(level=logging.INFO)
 
@@ -27,22 +26,6 @@ expect_message_from_user = os.getenv("SENDER_NAME")
 token = token_hex(16)
 
 
-async def try_to_verify(expected):
-    # Connect to phpbb forum and fetch unread PM
-    async with PhpBB(host) as phpbb:
-        await phpbb.login(username, password)
-        await phpbb.fetch_unread_messages()
-        if message_to_read := phpbb.find_expected_message_by_user(expected):
-            message = await phpbb.read_private_message(message_to_read)
-            if message.content == token:
-                print("Valid token ! GOOD")
-                return True
-            else:
-                print("Invalid token ! BAD !")
-                return False
-        return False
-
-
 # Context Manager code
 async def main():
     print(
@@ -50,15 +33,23 @@ async def main():
         f"You're expected to be {expect_message_from_user}.\n"
         "You have 5 minutes."
     )
-    timeout = time.time() + 5 * 60  # 5 minutes from now
-    while True:
-        await asyncio.sleep(30)  # will fetch PM every 30 seconds
-        if time.time() > timeout:
-            break
-        valid = await try_to_verify(expect_message_from_user)
-        if valid:
-            print("Your token is valid!")
-            break
+    # One session for the whole wait, the inbox is polled every 5 to 30 seconds
+    async with PhpBB(host) as phpbb:
+        await phpbb.login(username, password)
+        watcher = UnreadWatcher(phpbb, min_interval=5, max_interval=30)
+
+        @watcher.on_message
+        async def verify(message):
+            if message.sender != expect_message_from_user:
+                return
+            message = await phpbb.read_private_message(message)
+            if message.content == token:
+                print("Your token is valid!")
+                watcher.stop()
+            else:
+                print("Invalid token ! BAD !")
+
+        await watcher.run(timeout=5 * 60)
 
 
 asyncio.run(main())
@@ -32,11 +32,10 @@ async def main():
     async with PhpBB(host) as phpbb:
         await phpbb.login(username, password)
         sent_message_list = await phpbb.fetch_sent_messages()
-        filtered_sent_message_list = [m for m in sent_message_list if m.receiver == receiver]
+        filtered_sent_message_list = [m for m in sent_message_list if receiver in m.receivers]
 
         print(*filtered_sent_message_list, sep="\n")
-        for m in filtered_sent_message_list:
-            await phpbb.delete_mp(m)
+        await phpbb.delete_many(filtered_sent_message_list)
 
 
 asyncio.run(main())
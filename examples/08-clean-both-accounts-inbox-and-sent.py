@@ -8,7 +8,7 @@ import os
 
 from dotenv import load_dotenv
 
-from pyphpbb_sl import PhpBB
+from pyphpbb_sl import SessionPool
 
 logging.basicConfig(level=logging.INFO)
 
@@ -28,37 +28,35 @@ password_b = os.getenv("SENDER_PASSWORD")
 # logging.debug("password %s", password_A)
 
 
-# Context Manager code
-async def clean(user, password, other_user):
-    async with PhpBB(host) as phpbb:
-        await phpbb.login(user, password)
+async def clean(user, phpbb):
+    other_user = account_b if user == account_a else account_a
 
-        # Unread messages
-        logging.info("clean account A unread mess")
-        unread_mess_list = await phpbb.fetch_unread_messages()
-        filtered_unread_mess_by_sender = [m for m in unread_mess_list if m.sender == other_user]
-        for m in filtered_unread_mess_by_sender:
-            await phpbb.delete_mp(m)
+    # Unread messages
+    logging.info("clean account %s unread mess", user)
+    unread_mess_list = await phpbb.fetch_unread_messages()
+    filtered_unread_mess_by_sender = [m for m in unread_mess_list if m.sender == other_user]
+    await phpbb.delete_many(filtered_unread_mess_by_sender)
 
-        # Read messages
-        logging.info("clean account A read mess")
-        read_mess_list = await phpbb.fetch_read_messages()
-        filtered_mess_by_sender = [m for m in read_mess_list if m.sender == other_user]
-        for m in filtered_mess_by_sender:
-            await phpbb.delete_mp(m)
+    # Read messages
+    logging.info("clean account %s read mess", user)
+    read_mess_list = await phpbb.fetch_read_messages()
+    filtered_mess_by_sender = [m for m in read_mess_list if m.sender == other_user]
+    await phpbb.delete_many(filtered_mess_by_sender)
 
-        # Sent messages
-        logging.info("clean account A sent mess")
-        sent_message_list = await phpbb.fetch_sent_messages()
-        filtered_sent_message_list = [m for m in sent_message_list if m.receiver == other_user]
-        for m in filtered_sent_message_list:
-            await phpbb.delete_mp(m)
+    # Sent messages
+    logging.info("clean account %s sent mess", user)
+    sent_message_list = await phpbb.fetch_sent_messages()
+    filtered_sent_message_list = [m for m in sent_message_list if other_user in m.receivers]
+    await phpbb.delete_many(filtered_sent_message_list)
 
 
+# Both accounts are logged in, and cleaned, concurrently
 async def main():
-    await clean(account_a, password_a, account_b)
-    await asyncio.sleep(1)
-    await clean(account_b, password_b, account_a)
+    if not (host and account_a and password_a and account_b and password_b):
+        raise SystemExit("Set HOST, RECEIVER_NAME/PASSWORD and SENDER_NAME/PASSWORD in .env")
+    accounts = {account_a: password_a, account_b: password_b}
+    async with SessionPool(host, accounts) as pool:
+        await pool.each(clean)
 
 
 asyncio.run(main())
@@ -8,11 +8,11 @@ import re
 from string import ascii_uppercase
 from urllib.parse import urljoin
 
-import httpx
 from dotenv import load_dotenv
 from selectolax.parser import HTMLParser, Node
 
 from pyphpbb_sl import PhpBB
+from pyphpbb_sl.browser import BrowserError
 
 logging.basicConfig(level=logging.INFO)
 
@@ -63,9 +63,11 @@ async def get_all_topics(phpbb, html, url):
     while n > 0:
         params = {"start": start}
         try:
+            # Browser already retries with backoff, give up on this forum
             html = await phpbb.browser.get_html(url, params=params)
-        except httpx.TransportError:
-            continue
+        except BrowserError as e:
+            logging.error(e)
+            break
         new_topics = get_topics(html)
         topics += new_topics
         n -= 40
@@ -101,8 +103,9 @@ async def main():
         print(url)
         try:
             html = await phpbb.browser.get_html(url)
-        except httpx.TransportError:
-            continue
+        except BrowserError as e:
+            logging.error(e)
+            break
         sub_forums = get_sub_forums(html)
         active_topics_flag = (
             node := html.css_first("#active_topics")
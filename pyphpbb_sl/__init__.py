@@ -6,5 +6,7 @@ __version__ = "1.0.0"
 
 
 from .phpbb import Message, PhpBB
+from .pool import SessionPool
+from .watcher import UnreadWatcher
 
-__all__ = ["PhpBB", "Message"]
+__all__ = ["PhpBB", "Message", "SessionPool", "UnreadWatcher"]
@@ -0,0 +1,285 @@
+# pyphpbb_sl/archive.py
+"""Local archive of private messages, in SQLite with full-text search (FTS5).
+
+::
+
+    archive = MessageArchive("pm.sqlite")
+    async with PhpBB(host) as phpbb:
+        await phpbb.login(username, password)
+        await archive.sync(phpbb)
+
+    archive.search("token", sender="Foo", since=datetime(2024, 1, 1))
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from .models import Message
+from .models.message import from_seconds, to_seconds
+from .phpbb import INBOX, SENTBOX, PhpBB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    pk INTEGER PRIMARY KEY,  -- rowid of the FTS index
+    id INTEGER NOT NULL,
+    folder TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    url TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    receiver TEXT,
+    receivers TEXT NOT NULL DEFAULT '',
+    content TEXT,
+    unread INTEGER NOT NULL,
+    attachment INTEGER NOT NULL DEFAULT 0,
+    folder_id INTEGER,
+    sent_at REAL,  -- naive wall-clock seconds, see models.message.to_seconds
+    archived_at REAL NOT NULL,
+    UNIQUE (folder, id)  -- a PM sent to oneself is in inbox and sentbox, same id
+);
+CREATE INDEX IF NOT EXISTS messages_sender ON messages (sender COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5 (
+    subject, content, content='messages', content_rowid='pk'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, subject, content)
+    VALUES (new.pk, new.subject, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, subject, content)
+    VALUES ('delete', old.pk, old.subject, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, subject, content)
+    VALUES ('delete', old.pk, old.subject, old.content);
+    INSERT INTO messages_fts (rowid, subject, content)
+    VALUES (new.pk, new.subject, new.content);
+END;
+"""
+
+COLUMNS = (
+    "id, subject, url, sender, receiver, content, unread, receivers, sent_at, attachment, folder_id"
+)
+
+
+def _seconds(moment: datetime | float | None) -> float | None:
+    """Naive wall-clock seconds (``to_seconds``) of a datetime or of a timestamp."""
+    if moment is None:
+        return None
+    if not isinstance(moment, datetime):
+        moment = datetime.fromtimestamp(moment)
+    return to_seconds(moment)
+
+
+def _fts_query(text: str) -> str:
+    """Match every word of ``text``, FTS5 operators being taken literally."""
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+class MessageArchive:
+    """Private messages (headers and bodies) saved in a SQLite database.
+
+    Searches are served offline. :meth:`sync` only downloads the messages
+    received since the newest archived one of each folder. Messages are
+    keyed on their folder and id, a message sent to oneself being archived
+    in both inbox and sentbox.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path)
+        try:
+            with db:  # commit, or rollback on error
+                yield db
+        finally:
+            db.close()
+
+    # -----------------------------
+    # WRITE
+    # -----------------------------
+
+    def add(self, messages: Iterable[Message], folder: str = "inbox") -> None:
+        """Save messages, a body already archived being kept if ``content`` is None."""
+        now = _seconds(time.time())
+        rows = [
+            (
+                m.id,
+                folder,
+                m.subject,
+                m.url,
+                m.sender,
+                m.receiver,
+                "\n".join(m.receivers),
+                m.content,
+                m.unread,
+                m.attachment,
+                m.folder_id,
+                _seconds(m.sent_at),
+                now,
+            )
+            for m in messages
+        ]
+        with self._connect() as db:
+            db.executemany(
+                "INSERT INTO messages (id, folder, subject, url, sender, receiver, receivers, "
+                "content, unread, attachment, folder_id, sent_at, archived_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (folder, id) DO UPDATE SET "
+                "subject = excluded.subject, url = excluded.url, sender = excluded.sender, "
+                "receiver = COALESCE(excluded.receiver, receiver), "
+                "receivers = COALESCE(NULLIF(excluded.receivers, ''), receivers), "
+                "content = COALESCE(excluded.content, content), unread = excluded.unread, "
+                "attachment = excluded.attachment, "
+                "folder_id = COALESCE(excluded.folder_id, folder_id), "
+                "sent_at = COALESCE(excluded.sent_at, sent_at)",
+                rows,
+            )
+
+    def delete(self, pm_ids: Iterable[int], folder: str | None = None) -> None:
+        """Delete messages of ``folder``, or of every folder."""
+        with self._connect() as db:
+            db.executemany(
+                "DELETE FROM messages WHERE id = ?1 AND (?2 IS NULL OR folder = ?2)",
+                ((i, folder) for i in pm_ids),
+            )
+
+    def last_id(self, folder: str) -> int:
+        """Highest message id archived in ``folder`` (0 if empty)."""
+        with self._connect() as db:
+            row = db.execute("SELECT MAX(id) FROM messages WHERE folder = ?", (folder,)).fetchone()
+        return row[0] or 0
+
+    def _without_body(self, folder: str) -> list[Message]:
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT {COLUMNS} FROM messages WHERE folder = ? AND content IS NULL "
+                "ORDER BY id DESC",
+                (folder,),
+            ).fetchall()
+        return [self._message(row) for row in rows]
+
+    async def sync(
+        self, phpbb: PhpBB, boxes: Iterable[dict] | None = None, read_bodies: bool = False
+    ) -> int:
+        """Archive the messages received since the last sync. Return their number.
+
+        Folders are read until the newest archived message of each one, the
+        session's own sync state (``phpbb.last_seen_ids``) being left as is.
+        With ``read_bodies``, bodies are downloaded too, and phpBB then marks
+        unread messages as read: those of the new messages, and those still
+        missing from the archive (synced without bodies, or that failed to
+        load last time). Bodies that fail to load are left empty and retried
+        on the next sync, the headers are archived anyway.
+        """
+        count = 0
+        for box in boxes or (INBOX, SENTBOX):
+            folder = box.get("folder", "inbox")
+            messages = await phpbb.fetch_since(self.last_id(folder), box)
+            count += len(messages)
+            if read_bodies:
+                messages += self._without_body(folder)
+            if read_bodies and messages:
+                results = await phpbb.read_many(messages)
+                messages = [
+                    m if isinstance(r, Exception) else r
+                    for m, r in zip(messages, results, strict=True)
+                ]
+            self.add(messages, folder)
+        return count
+
+    # -----------------------------
+    # READ
+    # -----------------------------
+
+    @staticmethod
+    def _message(row: tuple) -> Message:
+        pm_id, subject, url, sender, receiver, content, unread, *listing = row
+        receivers, sent_at, attachment, folder_id = listing
+        return Message(
+            pm_id,
+            subject,
+            url,
+            sender,
+            receiver,
+            content,
+            bool(unread),
+            receivers=tuple(receivers.split("\n")) if receivers else (),
+            sent_at=from_seconds(sent_at) if sent_at is not None else None,
+            attachment=bool(attachment),
+            folder_id=folder_id,
+        )
+
+    def get(self, pm_id: int, folder: str | None = None) -> Message | None:
+        """Message ``pm_id`` of ``folder``, or of the folder it was first archived in."""
+        with self._connect() as db:
+            row = db.execute(
+                f"SELECT {COLUMNS} FROM messages WHERE id = ?1 AND (?2 IS NULL OR folder = ?2) "
+                "ORDER BY pk LIMIT 1",
+                (pm_id, folder),
+            ).fetchone()
+        return self._message(row) if row else None
+
+    def search(
+        self,
+        text: str | None = None,
+        *,
+        sender: str | None = None,
+        receiver: str | None = None,
+        folder: str | None = None,
+        since: datetime | float | None = None,
+        until: datetime | float | None = None,
+        limit: int | None = 100,
+    ) -> list[Message]:
+        """Find archived messages, newest first.
+
+        ``text`` matches every word in subject or body. Names are matched
+        case-insensitively, ``receiver`` being any of the receivers.
+        ``since``/``until`` bound the date the message was sent, or archived
+        when the listing gave no date.
+        """
+        clauses: list[str] = []
+        params: list[object] = []
+        if text and text.strip():
+            clauses.append("pk IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)")
+            params.append(_fts_query(text))
+        if sender is not None:
+            clauses.append("sender = ? COLLATE NOCASE")
+            params.append(sender)
+        if receiver is not None:
+            clauses.append(
+                "(receiver = ? COLLATE NOCASE OR instr("
+                "char(10) || lower(receivers) || char(10), char(10) || lower(?) || char(10)))"
+            )
+            params += [receiver, receiver]
+        if folder is not None:
+            clauses.append("folder = ?")
+            params.append(folder)
+        if since is not None:
+            clauses.append("COALESCE(sent_at, archived_at) >= ?")
+            params.append(_seconds(since))
+        if until is not None:
+            clauses.append("COALESCE(sent_at, archived_at) < ?")
+            params.append(_seconds(until))
+        query = f"SELECT {COLUMNS} FROM messages"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id DESC, pk"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as db:
+            return [self._message(row) for row in db.execute(query, params)]
+
+    def __len__(self) -> int:
+        with self._connect() as db:
+            return int(db.execute("SELECT COUNT(*) FROM messages").fetchone()[0])
@@ -2,13 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
 from collections import namedtuple
 from typing import Any
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 
 import httpx
 from selectolax.parser import HTMLParser
 
+from .cache import CacheEntry, HTTPCache
+from .hooks import (
+    PARSE,
+    REQUEST_END,
+    REQUEST_START,
+    RETRY,
+    WAIT,
+    BrowserEvent,
+    Hook,
+    current_operation,
+)
+from .parsers import parse_html
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+from .session import SessionState
+
+logger = logging.getLogger(__name__)
+
 Cookie = namedtuple("Cookie", ["key", "value"])
 
 headers = {
@@ -16,39 +37,297 @@ headers = {
 }
 
 
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+# phpBB rejects a form posted in the same second it was displayed
+DEFAULT_MIN_FORM_AGE = 1.0
+
+
 class BrowserError(Exception):
     pass
 
 
+class CircuitOpenError(BrowserError):
+    """Raised without sending the request while the board keeps failing."""
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that never closes the transport it delegates to.
+
+    ``AsyncClient.aclose()`` closes its transport, so a transport shared by
+    several clients is wrapped in this proxy and closed by its owner only.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
 class Browser:
-    """Async HTTP browser using httpx + selectolax."""
+    """Async HTTP browser using httpx + selectolax.
 
-    def __init__(self, base_url: str, user_agent: str | None = None) -> None:
+    Args:
+        base_url: url of the forum, relative urls are joined to it.
+        user_agent: override the default ``User-Agent`` header.
+        timeout: timeout (seconds) of every request.
+        limits: connection pool limits of the underlying transport.
+        keepalive_expiry: seconds an idle keep-alive connection is kept.
+            Ignored when ``limits`` is given.
+        http2: enable HTTP/2 (needs the ``h2`` package: ``httpx[http2]``).
+        transport: existing transport to share between several browsers.
+            Each browser keeps its own client, hence its own cookie jar.
+            The caller owns the transport and closes it.
+        rate_limiter: per-host read/write budgets, shareable between
+            browsers. Defaults to a :class:`RateLimiter` with default budgets.
+        min_form_age: minimum delay (seconds) between fetching a form and
+            posting it, phpBB form tokens are refused when posted too fast.
+        cache: opt-in :class:`HTTPCache` used by :meth:`get_html`.
+        retry: :class:`RetryPolicy` of GET requests (3 tries by default).
+        breaker: per-host :class:`CircuitBreaker`, shareable between browsers.
+        hooks: callables receiving every :class:`BrowserEvent`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        user_agent: str | None = None,
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+        limits: httpx.Limits | None = None,
+        keepalive_expiry: float | None = None,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        min_form_age: float = DEFAULT_MIN_FORM_AGE,
+        cache: HTTPCache | None = None,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        hooks: list[Hook] | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.min_form_age = min_form_age
+        self._form_loaded_at = 0.0
+        self.cache = cache
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.hooks: list[Hook] = list(hooks or [])
+        if transport is None:
+            transport = Browser.make_transport(
+                limits=limits, keepalive_expiry=keepalive_expiry, http2=http2
+            )
+        else:
+            transport = _SharedTransport(transport)
         self.client = httpx.AsyncClient(
-            headers=headers,
-            timeout=10.0,
+            headers=dict(headers, **{"User-Agent": user_agent}) if user_agent else headers,
+            timeout=timeout,
             follow_redirects=True,
+            transport=transport,
+            event_hooks={"response": [self._track_session]},
         )
+        self.session = SessionState()
+
+    @staticmethod
+    def make_transport(
+        *,
+        limits: httpx.Limits | None = None,
+        keepalive_expiry: float | None = None,
+        http2: bool = False,
+    ) -> httpx.AsyncHTTPTransport:
+        """Build a pooled transport, suitable to be shared between browsers."""
+        if limits is None:
+            limits = httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_KEEPALIVE,
+                keepalive_expiry=keepalive_expiry
+                if keepalive_expiry is not None
+                else DEFAULT_KEEPALIVE_EXPIRY,
+            )
+        return httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+
+    # -----------------------------
+    # REQUEST
+    # -----------------------------
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        full_url = urljoin(self.base_url + "/", url)
+        host = urlsplit(full_url).netloc
+        write = method != "GET"
+        attempts = 1 if write else self.retry.attempts  # POST is not idempotent
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow(host):
+                raise CircuitOpenError(f"{method} refused for {url}: {host} is failing")
+            waited = await self.rate_limiter.acquire(full_url, write=write)
+            if write:
+                waited += await self._wait_form_age()
+            if waited:
+                self._emit(WAIT, method, full_url, elapsed=waited, attempt=attempt)
+
+            response = None
+            self._emit(REQUEST_START, method, full_url, attempt=attempt)
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, full_url, **kwargs)
+                if response.status_code != httpx.codes.NOT_MODIFIED:  # answer to a conditional GET
+                    response.raise_for_status()
+            except httpx.HTTPError as e:
+                self._emit_response(method, full_url, response, start, attempt, error=e)
+                transient = isinstance(e, httpx.TransportError) or (
+                    response is not None and self.retry.is_transient(response)
+                )
+                if not transient:
+                    self.breaker.record_success(host)  # the board answered
+                    raise BrowserError(f"{method} failed for {url}: {e}") from e
+                self.breaker.record_failure(host)
+                if attempt >= attempts:
+                    raise BrowserError(f"{method} failed for {url}: {e}") from e
+                delay = self.retry.delay(attempt, response)
+                logger.warning("%s %s failed (%s), retry in %.2fs", method, url, e, delay)
+                self._emit(RETRY, method, full_url, elapsed=delay, attempt=attempt, error=e)
+                await asyncio.sleep(delay)
+                continue
+
+            self._emit_response(method, full_url, response, start, attempt)
+            self.breaker.record_success(host)
+            if write and self.cache is not None:
+                # any write may change what the cached pages show
+                self.cache.clear()
+            return response
+
+    async def _wait_form_age(self) -> float:
+        """Sleep until the last fetched form is old enough to be posted."""
+        remaining = self._form_loaded_at + self.min_form_age - time.monotonic()
+        if remaining <= 0:
+            return 0.0
+        await asyncio.sleep(remaining)
+        return remaining
+
+    # -----------------------------
+    # HOOKS
+    # -----------------------------
+    def add_hook(self, hook: Hook) -> None:
+        """Register ``hook(event)``, called for every :class:`BrowserEvent`."""
+        self.hooks.append(hook)
+
+    def _emit(self, kind: str, method: str, url: str, **fields) -> None:
+        if not self.hooks:
+            return
+        event = BrowserEvent(kind, method, url, operation=current_operation.get(), **fields)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:  # a broken hook must not break requests
+                logger.exception("Browser hook %r failed", hook)
+
+    def _emit_response(self, method, url, response, start, attempt, error=None) -> None:
+        if not self.hooks:
+            return
+        size = None
+        if response is not None:
+            # octets reçus (compressés), sauf réponse déjà lue par le transport (MockTransport)
+            size = response.num_bytes_downloaded or len(response.content)
+        self._emit(
+            REQUEST_END,
+            method,
+            url,
+            status=response.status_code if response is not None else None,
+            size=size,
+            elapsed=time.perf_counter() - start,
+            attempt=attempt,
+            error=error,
+        )
+
+    def _parse(self, content: bytes, charset: str | None, url: str) -> HTMLParser:
+        start = time.perf_counter()
+        root = parse_html(content, charset)
+        self._emit(PARSE, "GET", url, size=len(content), elapsed=time.perf_counter() - start)
+        return root
 
     # -----------------------------
     # GET HTML
     # -----------------------------
-    async def get_html(self, url: str, **kwargs) -> HTMLParser:
-        try:
-            full_url = urljoin(self.base_url + "/", url)
-            r = await self.client.get(full_url, **kwargs)
-            r.raise_for_status()
-            return HTMLParser(r.text)
-        except httpx.HTTPError as e:
-            raise BrowserError(f"GET failed for {url}: {e}") from e
+    async def get_html(
+        self, url: str, use_cache: bool = True, cache: HTTPCache | None = None, **kwargs
+    ) -> HTMLParser:
+        """Return the parsed page of ``url``.
+
+        ``cache`` is used instead of the browser cache for this call only.
+        """
+        cache = self.cache if cache is None else cache  # un cache vide est falsy
+        if cache is None or not use_cache:
+            r = await self._request("GET", url, **kwargs)
+            return self._parse(r.content, r.charset_encoding, str(r.url))
+        entry = await self._cached_get(cache, url, **kwargs)
+        if entry.root is None:
+            entry.root = self._parse(entry.content, entry.charset, self._cache_key(url, kwargs))
+        return entry.root
+
+    # -----------------------------
+    # GET BYTES
+    # -----------------------------
+    async def get_bytes(
+        self, url: str, use_cache: bool = True, cache: HTTPCache | None = None, **kwargs
+    ) -> bytes:
+        """Return the raw body of ``url``, neither decoded nor parsed."""
+        cache = self.cache if cache is None else cache  # un cache vide est falsy
+        if cache is None or not use_cache:
+            r = await self._request("GET", url, **kwargs)
+            return r.content
+        return (await self._cached_get(cache, url, **kwargs)).content
+
+    def _cache_key(self, url: str, kwargs: dict) -> str:
+        """Absolute url of a GET, with its query parameters."""
+        full_url = urljoin(self.base_url + "/", url)
+        return str(httpx.URL(full_url, params=kwargs.get("params")))
+
+    async def _cached_get(self, cache: HTTPCache, url: str, **kwargs) -> CacheEntry:
+        key = self._cache_key(url, kwargs)
+        entry = cache.get(key)
+        if entry is not None and entry.fresh:
+            return entry
+
+        request_headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        r = await self._request("GET", url, headers=request_headers, **kwargs)
+        ttl = cache.ttl_for(key)
+        if r.status_code == 304 and entry is not None:
+            entry.expires = time.monotonic() + ttl
+            return entry
+
+        entry = CacheEntry(
+            content=r.content,
+            charset=r.charset_encoding,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+            expires=time.monotonic() + ttl,
+        )
+        if ttl > 0 or entry.has_validators:
+            cache.store(key, entry)
+        else:
+            cache.discard(key)
+        return entry
 
     # -----------------------------
     # PARSE with SELECTOLAX
     # -----------------------------
 
     @staticmethod
-    def html2root(html: str) -> HTMLParser:
+    def html2root(html: str | bytes) -> HTMLParser:
+        if isinstance(html, bytes):
+            return parse_html(html)
         return HTMLParser(html)
 
     # -----------------------------
@@ -56,7 +335,8 @@ class Browser:
     # -----------------------------
 
     async def get_form(self, url: str, form_id: str, **kwargs) -> dict[str, Any]:
-        root = await self.get_html(url, **kwargs)
+        root = await self.get_html(url, use_cache=False, **kwargs)
+        self._form_loaded_at = time.monotonic()
         form = root.css_first(f"form#{form_id}")
 
         if form is None:
@@ -90,7 +370,8 @@ class Browser:
     # SELECT TAGS
     # -----------------------------
     async def select_tag(self, url: str, selector: str) -> dict[str | None, str | None]:
-        root = await self.get_html(url)
+        root = await self.get_html(url, use_cache=False)
+        self._form_loaded_at = time.monotonic()
         items = root.css(selector)
         return {
             i.attributes["name"]: i.attributes.get("value", "")
@@ -102,12 +383,7 @@ class Browser:
     # POST
     # -----------------------------
     async def post(self, url: str, **kwargs) -> httpx.Response:
-        try:
-            r = await self.client.post(url, **kwargs)
-            r.raise_for_status()
-            return r
-        except httpx.HTTPError as e:
-            raise BrowserError(f"POST failed for {url}: {e}") from e
+        return await self._request("POST", url, **kwargs)
 
     # -----------------------------
     # COOKIES
@@ -115,6 +391,42 @@ class Browser:
     def list_cookies(self) -> list[Cookie]:
         return [Cookie(cookie.name, cookie.value) for cookie in self.client.cookies.jar]
 
+    async def _track_session(self, response: httpx.Response) -> None:
+        # called for every response, redirects included
+        self.session.update((cookie.name, cookie.value) for cookie in response.cookies.jar)
+
+    def export_cookies(self) -> list[dict[str, Any]]:
+        """Return the cookie jar as a list of JSON serializable dicts."""
+        return [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path,
+                "expires": c.expires,
+                "secure": c.secure,
+            }
+            for c in self.client.cookies.jar
+        ]
+
+    def import_cookies(self, cookies: list[dict[str, Any]]) -> None:
+        """Load cookies exported by :meth:`export_cookies` and sync session state."""
+        now = time.time()
+        for c in cookies:
+            if c.get("expires") is not None and c["expires"] < now:
+                continue
+            self.client.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+        self.sync_session()
+
+    def clear_cookies(self) -> None:
+        self.client.cookies.clear()
+        self.session.reset()
+
+    def sync_session(self) -> None:
+        """Rebuild session state from the cookie jar (after editing the jar)."""
+        self.session.reset()
+        self.session.update(self.list_cookies())
+
     # -----------------------------
     # CLOSE
     # -----------------------------
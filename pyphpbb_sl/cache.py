@@ -0,0 +1,88 @@
+# pyphpbb_sl/cache.py
+"""In-memory HTTP cache used by :class:`pyphpbb_sl.browser.Browser`."""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from selectolax.parser import HTMLParser
+
+DEFAULT_MAXSIZE = 128
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    content: bytes
+    charset: str | None
+    etag: str | None
+    last_modified: str | None
+    expires: float  # time.monotonic() deadline
+    root: HTMLParser | None = None  # parsed once by Browser.get_html, shared by every hit
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class HTTPCache:
+    """Size-bounded LRU cache of GET responses, with per-url TTLs.
+
+    phpBB pages rarely send validators, so freshness is mostly driven by
+    the TTL rules given by the caller. Responses with an ``ETag`` or a
+    ``Last-Modified`` header are also kept once stale, and revalidated
+    with a conditional GET (a ``304`` reuses the cached page).
+
+    The cache is bound to a session: pages differ from one account to
+    another, so do not share a cache between browsers.
+
+    Args:
+        maxsize: maximum number of cached urls.
+        ttl: default time to live (seconds) of a cached page.
+        rules: ``{regex: ttl}``, the first regex matching (``re.search``)
+            the full url gives its TTL, e.g. ``{r"memberlist\\.php": 3600}``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl: float = 0.0,
+        rules: dict[str, float] | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.rules = [(re.compile(pattern), value) for pattern, value in (rules or {}).items()]
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, url: str) -> float:
+        """Return the time to live of ``url``."""
+        return next((value for regex, value in self.rules if regex.search(url)), self.ttl)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the entry of ``key`` (fresh or not) and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        """Add or replace ``key``, evicting the least recently used entries."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,723 @@
+# pyphpbb_sl/fakeboard.py
+"""Local phpBB stand-in, for offline tests and benchmarks.
+
+``FakeBoard`` is a plain ASGI application implementing the pages used by
+:class:`pyphpbb_sl.PhpBB`, with prosilver-like HTML. It runs in-process
+through ``httpx.ASGITransport`` (no socket, no server), or behind any ASGI
+server::
+
+    board = FakeBoard.generate(users=50, messages=20)
+    transport = httpx.ASGITransport(app=board)
+    async with PhpBB("http://board.test", transport=transport) as phpbb:
+        await phpbb.login("user0", "password0")
+
+Latency and the PM flood limit are configurable, to mimic a real board.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import secrets
+import time
+from collections.abc import Awaitable, Callable, MutableMapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from html import escape
+from typing import Any
+from urllib.parse import parse_qs
+
+# ASGI
+Scope = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+Send = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+
+ANONYMOUS = 1
+# memberlist sort keys (sk)
+MEMBER_SORT_KEYS = {
+    "a": lambda u: u.name.casefold(),
+    "c": lambda u: (u.joined, u.uid),
+    "d": lambda u: u.posts,
+    "m": lambda u: u.rank.casefold(),
+}
+COOKIE_PREFIX = "phpbb3_fake"
+INBOX_ID = 0
+SENTBOX_ID = -1
+FOLDER_NAMES = {"inbox": INBOX_ID, "sentbox": SENTBOX_ID}
+RANKS = ("Nouveau", "Membre", "Habitué", "Modérateur", "Administrateur")
+# forum id -> (name, parent id), parent 0 is a category shown on the index
+FORUMS = {
+    1: ("Comics", 0),
+    2: ("Marvel", 1),
+    3: ("DC Comics", 1),
+    4: ("DC Rebirth", 3),
+    5: ("Discussions", 0),
+    6: ("Blabla", 5),
+}
+
+
+@dataclass(slots=True)
+class FakeUser:
+    uid: int
+    name: str
+    password: str
+    rank: str = "Membre"
+    posts: int = 0
+    joined: datetime = field(default_factory=lambda: datetime(2020, 1, 1, tzinfo=UTC))
+    birthday_age: int | None = None  # set when today is the user birthday
+
+
+@dataclass(slots=True)
+class FakePM:
+    id: int
+    sender: int
+    recipients: tuple[int, ...]
+    subject: str
+    text: str
+    sent_at: datetime
+    attachment: bool = False
+
+
+@dataclass(slots=True)
+class _Request:
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    form: dict[str, list[str]]
+    cookies: dict[str, str]
+
+    def arg(self, name: str, default: str = "") -> str:
+        values = self.query.get(name) or self.form.get(name)
+        return values[0] if values else default
+
+
+@dataclass(slots=True)
+class _Response:
+    body: str
+    status: int = 200
+    cookies: list[str] = field(default_factory=list)
+
+
+class FakeBoard:
+    """In-memory phpBB board, as an ASGI application.
+
+    Args:
+        latency: seconds added to every response.
+        flood_interval: minimum seconds between two PMs sent by the same
+            user, like phpBB ``flood_interval`` (0 disables it).
+        form_min_age: minimum seconds between displaying and posting a form.
+        per_page: messages shown per page of a PM folder.
+        max_recipients: maximum recipients of a PM, like phpBB
+            ``pm_max_recipients`` (0 for no limit).
+        members_per_page: members shown per page of the memberlist.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        flood_interval: float = 0.0,
+        form_min_age: float = 0.0,
+        per_page: int = 50,
+        max_recipients: int = 0,
+        members_per_page: int = 25,
+    ) -> None:
+        self.latency = latency
+        self.flood_interval = flood_interval
+        self.form_min_age = form_min_age
+        self.per_page = per_page
+        self.max_recipients = max_recipients
+        self.members_per_page = members_per_page
+        self.users: dict[int, FakeUser] = {}
+        self.messages: dict[int, FakePM] = {}
+        self.inbox: dict[int, dict[int, bool]] = {}  # uid -> {pm id: unread}
+        self.sentbox: dict[int, dict[int, None]] = {}  # uid -> {pm id}
+        self.sessions: dict[str, int] = {}  # sid -> uid
+        self.requests = 0
+        self._last_pm_at: dict[int, float] = {}
+        self._salt = secrets.token_hex(8)
+        self._next_uid = 2  # 1 is ANONYMOUS
+        self._next_pm = 1
+
+    # -----------------------------
+    # DATA
+    # -----------------------------
+
+    @classmethod
+    def generate(
+        cls, users: int = 20, messages: int = 10, seed: int = 0, **kwargs: Any
+    ) -> FakeBoard:
+        """Board with ``users`` users and ``messages`` PMs received by each.
+
+        User N logs in as ``user<N>`` with ``password<N>``.
+        """
+        rng = random.Random(seed)
+        board = cls(**kwargs)
+        for n in range(users):
+            board.add_user(
+                f"user{n}",
+                f"password{n}",
+                rank=rng.choice(RANKS),
+                posts=rng.randint(0, 5000),
+                joined=datetime(2020, 1, 1, tzinfo=UTC) + timedelta(hours=rng.randint(0, 30000)),
+                birthday_age=rng.randint(18, 60) if n % 7 == 0 else None,
+            )
+        names = [f"user{n}" for n in range(users)]
+        for name in names:
+            for n in range(messages):
+                sender = rng.choice([other for other in names if other != name] or names)
+                board.send_pm(sender, [name], f"Message {n} for {name}", f"Hello {name} #{n}")
+        return board
+
+    def add_user(self, name: str, password: str, **fields: Any) -> FakeUser:
+        user = FakeUser(self._next_uid, name, password, **fields)
+        self._next_uid += 1
+        self.users[user.uid] = user
+        self.inbox[user.uid] = {}
+        self.sentbox[user.uid] = {}
+        return user
+
+    def user(self, name: str) -> FakeUser | None:
+        name = name.strip().casefold()
+        return next((u for u in self.users.values() if u.name.casefold() == name), None)
+
+    def send_pm(
+        self, sender: str, recipients: list[str], subject: str, text: str, attachment: bool = False
+    ) -> FakePM:
+        author = self.user(sender)
+        targets = [self.user(name) for name in recipients]
+        if author is None or not targets or None in targets:
+            raise KeyError(f"Unknown user in {sender}, {recipients}")
+        uids = [t.uid for t in targets if t is not None]
+        return self._store_pm(author.uid, uids, subject, text, attachment)
+
+    def _store_pm(
+        self, sender: int, recipients: list[int], subject: str, text: str, attachment: bool = False
+    ) -> FakePM:
+        pm = FakePM(
+            self._next_pm,
+            sender,
+            tuple(recipients),
+            subject,
+            text,
+            datetime.now(UTC).replace(microsecond=0),
+            attachment,
+        )
+        self._next_pm += 1
+        self.messages[pm.id] = pm
+        self.sentbox[sender][pm.id] = None
+        for uid in recipients:
+            self.inbox[uid][pm.id] = True
+        return pm
+
+    # -----------------------------
+    # ASGI
+    # -----------------------------
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        cookies = {}
+        for key, value in scope["headers"]:
+            if key == b"cookie":
+                for part in value.decode("latin-1").split(";"):
+                    name, _, val = part.strip().partition("=")
+                    cookies[name] = val
+        request = _Request(
+            scope["method"],
+            scope["path"],
+            parse_qs(scope["query_string"].decode("latin-1"), keep_blank_values=True),
+            parse_qs(body.decode("utf-8"), keep_blank_values=True),
+            cookies,
+        )
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self.handle(request)
+        headers = [(b"content-type", b"text/html; charset=UTF-8")]
+        headers += [(b"set-cookie", c.encode("latin-1")) for c in response.cookies]
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body.encode("utf-8")})
+
+    def handle(self, request: _Request) -> _Response:
+        cookies: list[str] = []
+        sid = request.cookies.get(f"{COOKIE_PREFIX}_sid", "")
+        if sid not in self.sessions:
+            sid = self._new_session(ANONYMOUS, cookies)
+        uid = self.sessions[sid]
+
+        page = request.path.rsplit("/", 1)[-1] or "index.php"
+        if page == "ucp.php":
+            response = self._ucp(request, sid, uid, cookies)
+        elif page == "memberlist.php":
+            response = self._memberlist(request, sid, uid)
+        elif page == "index.php":
+            response = self._index(sid, uid)
+        elif page == "viewforum.php":
+            response = self._viewforum(request, sid, uid)
+        else:
+            response = _Response(self._page("Erreur", "<p>Page introuvable</p>", sid, uid), 404)
+        response.cookies = cookies + response.cookies
+        return response
+
+    # -----------------------------
+    # SESSIONS AND FORMS
+    # -----------------------------
+
+    def _new_session(self, uid: int, cookies: list[str], autologin: bool = False) -> str:
+        sid = secrets.token_hex(16)
+        self.sessions[sid] = uid
+        cookies.append(f"{COOKIE_PREFIX}_u={uid}; path=/; HttpOnly")
+        cookies.append(f"{COOKIE_PREFIX}_k={secrets.token_hex(8) if autologin else ''}; path=/")
+        cookies.append(f"{COOKIE_PREFIX}_sid={sid}; path=/; HttpOnly")
+        return sid
+
+    def _form_key(self, name: str, sid: str) -> str:
+        now = int(time.time())
+        token = hashlib.sha1(f"{now}{self._salt}{name}{sid}".encode()).hexdigest()
+        return (
+            f'<input type="hidden" name="creation_time" value="{now}" />\n'
+            f'<input type="hidden" name="form_token" value="{token}" />\n'
+        )
+
+    def _check_form_key(self, request: _Request, name: str, sid: str) -> bool:
+        created = request.arg("creation_time")
+        if not created.isdigit() or time.time() - int(created) < self.form_min_age:
+            return False
+        expected = hashlib.sha1(f"{created}{self._salt}{name}{sid}".encode()).hexdigest()
+        return request.arg("form_token") == expected
+
+    # -----------------------------
+    # HTML
+    # -----------------------------
+
+    def _page(self, title: str, body: str, sid: str, uid: int) -> str:
+        if uid != ANONYMOUS:
+            nav = (
+                f'<a href="./ucp.php?i=pm&amp;folder=inbox">Messagerie</a> '
+                f'<a href="./ucp.php?mode=logout&amp;sid={sid}">Déconnexion '
+                f"[ {escape(self.users[uid].name)} ]</a>"
+            )
+        else:
+            nav = '<a href="./ucp.php?mode=login">Connexion</a>'
+        return (
+            '<!DOCTYPE html>\n<html dir="ltr" lang="fr">\n<head>\n<meta charset="utf-8" />\n'
+            f"<title>{escape(title)} - Fake board</title>\n</head>\n<body>\n"
+            f'<div id="wrap" class="wrap">\n<div class="navbar">{nav}</div>\n'
+            f'<div id="page-body" class="page-body">\n{body}\n</div>\n</div>\n</body>\n</html>\n'
+        )
+
+    def _message(self, text: str, sid: str, uid: int, status: int = 200) -> _Response:
+        body = f'<div class="panel" id="message"><div class="inner"><p>{text}</p></div></div>'
+        return _Response(self._page("Information", body, sid, uid), status)
+
+    def _user_link(self, user: FakeUser) -> str:
+        return (
+            f'<a href="./memberlist.php?mode=viewprofile&amp;u={user.uid}" '
+            f'class="username">{escape(user.name)}</a>'
+        )
+
+    @staticmethod
+    def _format_date(moment: datetime) -> str:
+        return moment.strftime("%a %b %d, %Y %I:%M %p")
+
+    def _pagination(
+        self, url: str, total: int, start: int, label: str, per_page: int | None = None
+    ) -> str:
+        per_page = per_page or self.per_page
+        items = []
+        pages = max((total - 1) // per_page + 1, 1)
+        current = start // per_page
+        for page in range(pages):
+            if page == current:
+                items.append(f'<li class="active"><span>{page + 1}</span></li>')
+            else:
+                href = f"{url}&amp;start={page * per_page}"
+                items.append(f'<li><a class="button" href="{href}">{page + 1}</a></li>')
+        if current + 1 < pages:
+            href = f"{url}&amp;start={(current + 1) * per_page}"
+            items.append(
+                f'<li class="arrow next"><a class="button" href="{href}" rel="next">›</a></li>'
+            )
+        return f'<div class="pagination">{total} {label} • <ul>{"".join(items)}</ul></div>'
+
+    # -----------------------------
+    # UCP
+    # -----------------------------
+
+    def _ucp(self, request: _Request, sid: str, uid: int, cookies: list[str]) -> _Response:
+        mode = request.arg("mode")
+        if mode == "login":
+            if request.method == "POST":
+                return self._login(request, sid, uid, cookies)
+            return self._login_page(sid, uid)
+        if mode == "logout":
+            if request.arg("sid") == sid and uid != ANONYMOUS:
+                del self.sessions[sid]
+                sid = self._new_session(ANONYMOUS, cookies)
+            return self._message("Vous êtes déconnecté.", sid, ANONYMOUS)
+        if request.arg("i") != "pm" or uid == ANONYMOUS:
+            return self._login_page(sid, uid)
+        if mode == "compose":
+            if request.arg("action") == "delete":
+                return self._delete(request, sid, uid)
+            if request.method == "POST":
+                return self._compose_post(request, sid, uid)
+            return self._compose_page(sid, uid, [], "")
+        if mode == "view":
+            if request.arg("action") == "view_folder":
+                return self._mark_action(request, sid, uid)
+            return self._view(request, sid, uid)
+        return self._folder(request, sid, uid)
+
+    def _login_page(self, sid: str, uid: int, error: str = "") -> _Response:
+        error_html = f'<div class="error">{error}</div>' if error else ""
+        body = (
+            '<form action="./ucp.php?mode=login" method="post" id="login">\n'
+            f'<div class="panel"><h2>Connexion</h2>{error_html}\n'
+            '<input type="text" tabindex="1" name="username" id="username" value="" />\n'
+            '<input type="password" tabindex="2" id="password" name="password" />\n'
+            '<input type="checkbox" name="autologin" id="autologin" tabindex="4" />\n'
+            '<input type="checkbox" name="viewonline" id="viewonline" tabindex="5" />\n'
+            '<input type="hidden" name="redirect" value="./ucp.php?mode=login" />\n'
+            f'{self._form_key("login", sid)}<input type="hidden" name="sid" value="{sid}" />\n'
+            '<input type="submit" name="login" tabindex="6" value="Connexion" />\n'
+            "</div></form>"
+        )
+        return _Response(self._page("Connexion", body, sid, uid))
+
+    def _login(self, request: _Request, sid: str, uid: int, cookies: list[str]) -> _Response:
+        if not self._check_form_key(request, "login", sid):
+            return self._login_page(sid, uid, "Le formulaire envoyé est invalide.")
+        user = self.user(request.arg("username"))
+        if user is None or user.password != request.arg("password"):
+            return self._login_page(sid, uid, "Nom d’utilisateur ou mot de passe incorrect.")
+        del self.sessions[sid]
+        sid = self._new_session(user.uid, cookies, autologin="autologin" in request.form)
+        return self._message("Vous êtes connecté.", sid, user.uid)
+
+    def _compose_page(
+        self, sid: str, uid: int, recipients: list[FakeUser], error: str
+    ) -> _Response:
+        error_html = f'<p class="error">{error}</p>' if error else ""
+        hidden = "".join(
+            f'<input type="hidden" name="address_list[u][{u.uid}]" value="to" />\n'
+            for u in recipients
+        )
+        listed = "".join(
+            f'<li>{self._user_link(u)} <input type="submit" name="remove_u[{u.uid}]" '
+            'value="Supprimer" class="button2" /></li>'
+            for u in recipients
+        )
+        icons = "".join(f'<input type="radio" name="icon" value="{n}" />' for n in (0, 1, 2, 3))
+        body = (
+            f'<form id="postform" method="post" action="./ucp.php?i=pm&amp;mode=compose&amp;sid={sid}">\n'  # noqa: E501
+            f'<div class="panel" id="postingbox">{error_html}\n'
+            '<textarea id="username_list" name="username_list" rows="2" cols="50"></textarea>\n'
+            '<input type="submit" name="add_to" value="Ajouter" class="button2" />\n'
+            f'<ul class="recipients">{listed}</ul>\n{hidden}{icons}\n'
+            '<input type="text" name="subject" id="subject" size="45" maxlength="120" value="" />\n'
+            '<select name="addbbcode20"><option value="100" selected="selected">Normale</option>'
+            "</select>\n"
+            '<textarea name="message" id="message" rows="15" cols="76"></textarea>\n'
+            '<input type="checkbox" name="attach_sig" checked="checked" />\n'
+            f'<input type="hidden" name="lastclick" value="{int(time.time())}" />\n'
+            '<input type="hidden" name="status_switch" value="0" />\n'
+            f"{self._form_key('ucp_pm_compose', sid)}"
+            '<input type="submit" name="preview" value="Aperçu" class="button1" />\n'
+            '<input type="submit" name="post" value="Envoyer" class="button1" />\n'
+            "</div></form>"
+        )
+        return _Response(self._page("Rédiger un message", body, sid, uid))
+
+    def _compose_post(self, request: _Request, sid: str, uid: int) -> _Response:
+        uids = [
+            key[len("address_list[u][") : -1]
+            for key in request.form
+            if key.startswith("address_list[u][")
+        ]
+        recipients = [self.users[int(n)] for n in uids if n.isdigit() and int(n) in self.users]
+        if not self._check_form_key(request, "ucp_pm_compose", sid):
+            return self._compose_page(sid, uid, recipients, "Le formulaire envoyé est invalide.")
+
+        if "add_to" in request.form:
+            missing = []
+            for name in request.arg("username_list").splitlines():
+                if not name.strip():
+                    continue
+                user = self.user(name)
+                if user is None:
+                    missing.append(name.strip())
+                elif user not in recipients:
+                    recipients.append(user)
+            error = "Utilisateurs introuvables : " + ", ".join(missing) if missing else ""
+            if self.max_recipients and len(recipients) > self.max_recipients:
+                error = "Vous avez ajouté trop de destinataires."
+            return self._compose_page(sid, uid, recipients, error)
+
+        if not recipients:
+            return self._compose_page(sid, uid, [], "Vous devez indiquer au moins un destinataire.")
+        if self.max_recipients and len(recipients) > self.max_recipients:
+            return self._compose_page(
+                sid, uid, recipients, "Vous avez ajouté trop de destinataires."
+            )
+        now = time.monotonic()
+        last = self._last_pm_at.get(uid)
+        if self.flood_interval and last is not None and now - last < self.flood_interval:
+            return self._compose_page(sid, uid, recipients, "Vous ne pouvez pas envoyer si vite.")
+        self._last_pm_at[uid] = now
+        self._store_pm(
+            uid, [u.uid for u in recipients], request.arg("subject"), request.arg("message")
+        )
+        return self._message("Votre message a été envoyé avec succès.", sid, uid)
+
+    def _owned_folder(self, uid: int, folder: int) -> dict:
+        return self.sentbox[uid] if folder == SENTBOX_ID else self.inbox[uid]
+
+    def _delete(self, request: _Request, sid: str, uid: int) -> _Response:
+        folder, pm_id = int(request.arg("f", "0")), int(request.arg("p", "0"))
+        if pm_id not in self._owned_folder(uid, folder):
+            return self._message("Le message n’existe pas.", sid, uid)
+        if request.method == "POST" and "confirm" in request.form:
+            del self._owned_folder(uid, folder)[pm_id]
+            return self._message("Le message a été supprimé.", sid, uid)
+        key = secrets.token_hex(5)
+        body = (
+            f'<form id="confirm" action="./ucp.php?i=pm&amp;mode=compose&amp;action=delete'
+            f'&amp;f={folder}&amp;p={pm_id}&amp;confirm_key={key}" method="post">\n'
+            '<div class="panel"><h2>Supprimer le message</h2>\n'
+            f'<input type="hidden" name="p" value="{pm_id}" />\n'
+            f'<input type="hidden" name="f" value="{folder}" />\n'
+            '<input type="hidden" name="action" value="delete" />\n'
+            f'<input type="hidden" name="confirm_uid" value="{uid}" />\n'
+            f'<input type="hidden" name="sess" value="{sid}" />\n'
+            f'<input type="hidden" name="sid" value="{sid}" />\n'
+            '<input type="submit" name="confirm" value="Oui" class="button1" />\n'
+            '<input type="submit" name="cancel" value="Non" class="button2" />\n'
+            "</div></form>"
+        )
+        return _Response(self._page("Supprimer le message", body, sid, uid))
+
+    def _mark_action(self, request: _Request, sid: str, uid: int) -> _Response:
+        folder = int(request.arg("f", "0"))
+        if request.method != "POST" or request.arg("mark_option") != "delete_marked":
+            return self._folder(request, sid, uid)
+        ids = [
+            int(value)
+            for key, values in request.form.items()
+            if key.startswith("marked_msg_id[")
+            for value in values
+            if value.isdigit()
+        ]
+        box = self._owned_folder(uid, folder)
+        if "confirm" in request.form:
+            for pm_id in ids:
+                box.pop(pm_id, None)
+            return self._message("Les messages sélectionnés ont été supprimés.", sid, uid)
+        hidden = "".join(
+            f'<input type="hidden" name="marked_msg_id[{n}]" value="{pm_id}" />\n'
+            for n, pm_id in enumerate(ids)
+        )
+        body = (
+            '<form id="confirm" action="./ucp.php?i=pm&amp;mode=view&amp;action=view_folder'
+            f'&amp;f={folder}&amp;confirm_key={secrets.token_hex(5)}" method="post">\n'
+            '<div class="panel"><h2>Supprimer les messages marqués</h2>\n'
+            f'<input type="hidden" name="cur_folder_id" value="{folder}" />\n'
+            '<input type="hidden" name="mark_option" value="delete_marked" />\n'
+            f'<input type="hidden" name="submit_mark" value="1" />\n{hidden}'
+            f'<input type="hidden" name="confirm_uid" value="{uid}" />\n'
+            f'<input type="hidden" name="sess" value="{sid}" />\n'
+            '<input type="submit" name="confirm" value="Oui" class="button1" />\n'
+            '<input type="submit" name="cancel" value="Non" class="button2" />\n'
+            "</div></form>"
+        )
+        return _Response(self._page("Supprimer les messages marqués", body, sid, uid))
+
+    def _view(self, request: _Request, sid: str, uid: int) -> _Response:
+        folder, pm_id = int(request.arg("f", "0")), int(request.arg("p", "0"))
+        box = self._owned_folder(uid, folder)
+        if pm_id not in box:
+            return self._message("Le message n’existe pas.", sid, uid)
+        if folder != SENTBOX_ID:
+            box[pm_id] = False
+        pm = self.messages[pm_id]
+        body = (
+            f'<div id="p{pm.id}" class="post pm"><div class="postbody">\n'
+            f"<h3>{escape(pm.subject)}</h3>\n"
+            f'<p class="author">par {self._user_link(self.users[pm.sender])} » '
+            f"{self._format_date(pm.sent_at)}</p>\n"
+            f'<div class="content">{escape(pm.text)}</div>\n</div></div>'
+        )
+        return _Response(self._page(pm.subject, body, sid, uid))
+
+    def _folder(self, request: _Request, sid: str, uid: int) -> _Response:
+        name = request.arg("folder", "inbox")
+        folder = FOLDER_NAMES.get(name, int(name) if name.lstrip("-").isdigit() else INBOX_ID)
+        box = self._owned_folder(uid, folder)
+        ids = sorted(box, reverse=True)  # newest first
+        start = int(request.arg("start", "0") or 0)
+        rows = []
+        for n, pm_id in enumerate(ids[start : start + self.per_page]):
+            pm = self.messages[pm_id]
+            status = "pm_unread" if box[pm_id] else "pm_read"
+            if folder == SENTBOX_ID:
+                names = ", ".join(self._user_link(self.users[r]) for r in pm.recipients)
+                who = f"Destinataire : {names}"
+            else:
+                who = f"par {self._user_link(self.users[pm.sender])}"
+            clip = (
+                '<i class="icon fa-paperclip fa-fw" aria-hidden="true"></i>'
+                if pm.attachment
+                else ""
+            )
+            rows.append(
+                f'<li class="row bg{n % 2 + 1} {status}"><dl class="row-item {status}">'
+                '<dt><div class="list-inner">'
+                f'<a href="./ucp.php?i=pm&amp;mode=view&amp;f={folder}&amp;p={pm.id}" '
+                f'class="topictitle">{escape(pm.subject)}</a> {clip}<br />\n'
+                f"{who} » {self._format_date(pm.sent_at)}</div></dt>"
+                f'<dd class="mark"><input type="checkbox" name="marked_msg_id[]" value="{pm.id}" />'
+                "</dd></dl></li>\n"
+            )
+        url = f"./ucp.php?i=pm&amp;folder={name}"
+        body = (
+            f'<form id="viewfolder" method="post" action="./ucp.php?i=pm&amp;mode=view'
+            f'&amp;action=view_folder&amp;f={folder}">\n'
+            f"{self._pagination(url, len(ids), start, 'messages')}\n"
+            f'<ul class="topiclist cplist pmlist">\n{"".join(rows)}</ul>\n'
+            f'<input type="hidden" name="cur_folder_id" value="{folder}" />\n'
+            "</form>"
+        )
+        return _Response(self._page("Messagerie privée", body, sid, uid))
+
+    # -----------------------------
+    # MEMBERS
+    # -----------------------------
+
+    def _memberlist(self, request: _Request, sid: str, uid: int) -> _Response:
+        if not request.arg("mode"):
+            return self._member_rows(request, sid, uid)
+        if request.arg("mode") != "viewprofile":
+            return self._message("Page introuvable", sid, uid, 404)
+        member = None
+        if request.arg("u").isdigit():
+            member = self.users.get(int(request.arg("u")))
+        elif request.arg("un"):
+            member = self.user(request.arg("un"))
+        if member is None:
+            return self._message("L’utilisateur demandé n’existe pas.", sid, uid)
+        canonical = f"./memberlist.php?mode=viewprofile&amp;u={member.uid}"
+        body = (
+            f'<link rel="canonical" href="{canonical}" />\n'
+            f'<h2 class="memberlist-title">Profil de {escape(member.name)}</h2>\n'
+            '<div class="panel bg1"><div class="inner">\n'
+            '<dl class="left-box"><dt class="profile-avatar"></dt>'
+            f'<dd style="text-align: center;">{escape(member.rank)}</dd></dl>\n'
+            '<dl class="left-box details profile-details">\n'
+            f"<dt>Nom d’utilisateur :</dt><dd><span>{escape(member.name)}</span></dd>\n"
+            f"<dt>Rang :</dt><dd>{escape(member.rank)}</dd>\n"
+            f"<dt>Inscription :</dt><dd>{self._format_date(member.joined)}</dd>\n"
+            f"<dt>Messages :</dt><dd>{member.posts}</dd>\n"
+            "</dl></div></div>"
+        )
+        return _Response(self._page(f"Profil de {member.name}", body, sid, uid))
+
+    def _member_rows(self, request: _Request, sid: str, uid: int) -> _Response:
+        sort_key, order = request.arg("sk", "c"), request.arg("sd", "a")
+        first_char = request.arg("first_char")
+        members = [
+            u
+            for u in self.users.values()
+            if not first_char
+            or u.name[:1].casefold() == first_char
+            or (first_char == "other" and not u.name[:1].isalpha())
+        ]
+        members.sort(
+            key=MEMBER_SORT_KEYS.get(sort_key, MEMBER_SORT_KEYS["c"]), reverse=order == "d"
+        )
+        start = int(request.arg("start", "0") or 0)
+        rows = "".join(
+            f'<tr class="bg{n % 2 + 1}"><td><span class="rank-img">{escape(u.rank)}</span>'
+            f"{self._user_link(u)}</td>"
+            f'<td class="posts"><a href="./search.php?author_id={u.uid}&amp;sr=posts">'
+            f"{u.posts}</a></td>"
+            '<td class="info">&nbsp;</td>'
+            f"<td>{self._format_date(u.joined)}</td><td> - </td></tr>\n"
+            for n, u in enumerate(members[start : start + self.members_per_page])
+        )
+        url = f"./memberlist.php?sk={sort_key}&amp;sd={order}"
+        if first_char:
+            url += f"&amp;first_char={first_char}"
+        body = (
+            f"{self._pagination(url, len(members), start, 'utilisateurs', self.members_per_page)}\n"
+            '<table class="table1 memberlist" id="memberlist"><thead><tr>\n'
+            '<th class="name"><span class="rank-img"><a href="./memberlist.php?sk=m">Rang</a>'
+            '</span><a href="./memberlist.php?sk=a">Nom d’utilisateur</a></th>'
+            '<th class="posts"><a href="./memberlist.php?sk=d">Messages</a></th>'
+            '<th class="info">Site Internet</th>'
+            '<th class="joined"><a href="./memberlist.php?sk=c">Inscription</a></th>'
+            '<th class="active">Dernière visite</th>\n'
+            f"</tr></thead><tbody>\n{rows}</tbody></table>"
+        )
+        return _Response(self._page("Membres", body, sid, uid))
+
+    # -----------------------------
+    # FORUMS
+    # -----------------------------
+
+    def _forum_rows(self, parent: int) -> str:
+        rows = "".join(
+            '<li class="row"><dl class="row-item forum_read"><dt><div class="list-inner">'
+            f'<a href="./viewforum.php?f={fid}" class="forumtitle">{escape(name)}</a>'
+            "</div></dt></dl></li>\n"
+            for fid, (name, fparent) in FORUMS.items()
+            if fparent == parent
+        )
+        return f'<ul class="topiclist forums">\n{rows}</ul>' if rows else ""
+
+    def _index(self, sid: str, uid: int) -> _Response:
+        birthdays = ", ".join(
+            f"{self._user_link(u)} ({u.birthday_age})"
+            for u in self.users.values()
+            if u.birthday_age is not None
+        )
+        categories = "".join(
+            f'<div class="forabg"><div class="inner"><ul class="topiclist"><li class="header">'
+            f'<a href="./viewforum.php?f={fid}">{escape(name)}</a></li></ul>'
+            f"{self._forum_rows(fid)}</div></div>\n"
+            for fid, (name, parent) in FORUMS.items()
+            if parent == 0
+        )
+        body = (
+            f"{categories}"
+            '<div class="forabg"><div class="inner"><ul class="topiclist forums">'
+            '<li class="row"><div class="birthday-list"><p>Félicitations à : '
+            f"<strong>{birthdays}</strong></p></div></li></ul></div></div>"
+        )
+        return _Response(self._page("Index du forum", body, sid, uid))
+
+    def _viewforum(self, request: _Request, sid: str, uid: int) -> _Response:
+        fid = int(request.arg("f", "0") or 0)
+        if fid not in FORUMS:
+            return self._message("Le forum demandé n’existe pas.", sid, uid, 404)
+        name, _ = FORUMS[fid]
+        topics = "".join(
+            '<li class="row"><dl class="row-item topic_read"><dt><div class="list-inner">'
+            f'<a href="./viewtopic.php?t={fid * 100 + n}" class="topictitle">'
+            f"{escape(name)} topic {n}</a></div></dt></dl></li>\n"
+            for n in range(1, 6)
+        )
+        body = (
+            f'<h2 class="forum-title">{escape(name)}</h2>\n'
+            f'<div class="forabg"><div class="inner">{self._forum_rows(fid)}</div></div>\n'
+            f"{self._pagination(f'./viewforum.php?f={fid}', 5, 0, 'sujets')}\n"
+            f'<div class="forumbg"><div class="inner"><ul class="topiclist topics">{topics}'
+            "</ul></div></div>"
+        )
+        return _Response(self._page(name, body, sid, uid))
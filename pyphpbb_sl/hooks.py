@@ -0,0 +1,96 @@
+# pyphpbb_sl/hooks.py
+"""Instrumentation events emitted by :class:`pyphpbb_sl.browser.Browser`."""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, TypeVar, cast
+
+# logical PhpBB operation (fetch_box, send_private_message...) being run
+current_operation: ContextVar[str | None] = ContextVar("pyphpbb_operation", default=None)
+
+REQUEST_START = "request_start"
+REQUEST_END = "request_end"
+RETRY = "retry"
+PARSE = "parse"
+WAIT = "wait"
+
+
+@dataclass(slots=True)
+class BrowserEvent:
+    """One instrumentation event.
+
+    ``kind`` is one of ``request_start``, ``request_end`` (``status``,
+    ``size`` in bytes transferred, ``elapsed`` network time), ``retry``
+    (``attempt`` that failed, ``elapsed`` delay before next try), ``parse``
+    (``size`` of the decoded body, ``elapsed`` parse time) and ``wait``
+    (``elapsed`` spent in rate limiting).
+    """
+
+    kind: str
+    method: str
+    url: str
+    operation: str | None = None
+    status: int | None = None
+    size: int | None = None
+    elapsed: float | None = None
+    attempt: int = 1
+    error: BaseException | None = None
+
+
+Hook = Callable[[BrowserEvent], None]
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def operation(name: str | None = None) -> Callable[[F], F]:
+    """Decorate an async method so browser events carry its name.
+
+    Nested operations keep the name of the outermost one, i.e. the method
+    the user called. Async generators are supported: the name is set while
+    the generator runs, not while the caller handles a yielded item.
+    """
+
+    def decorator(func: F) -> F:
+        op_name = name or func.__name__
+        if inspect.isasyncgenfunction(func):
+            return cast(F, _async_gen_operation(func, op_name))
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if current_operation.get() is not None:
+                return await func(*args, **kwargs)
+            token = current_operation.set(op_name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                current_operation.reset(token)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def _async_gen_operation(func: Callable[..., Any], op_name: str) -> Callable[..., Any]:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        agen = func(*args, **kwargs)
+        try:
+            while True:
+                # posé à chaque pas : le contexte est celui de l'appelant
+                token = current_operation.set(op_name) if current_operation.get() is None else None
+                try:
+                    item = await agen.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    if token is not None:
+                        current_operation.reset(token)
+                yield item
+        finally:
+            await agen.aclose()
+
+    return wrapper
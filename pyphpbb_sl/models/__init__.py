@@ -1,4 +1,7 @@
 from .forum import SubForum
+from .mailbox import Mailbox
+from .member import Member, MemberRow
 from .message import Message
+from .message_store import MessageStore
 
-__all__ = ["Message", "SubForum"]
+__all__ = ["Mailbox", "Member", "MemberRow", "Message", "MessageStore", "SubForum"]
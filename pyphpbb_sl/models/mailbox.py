@@ -0,0 +1,142 @@
+from collections.abc import Iterable, Iterator
+
+from .message import Message
+
+# longueurs de préfixe de sujet indexées
+SUBJECT_PREFIX_LENGTHS = (1, 2, 4, 8, 16, 32)
+
+# (folder_id, id) : un MP envoyé à soi-même est dans inbox et sentbox, même id
+Key = tuple[int | None, int]
+Index = dict[str, dict[Key, None]]
+
+
+def _key(text: str) -> str:
+    return text.casefold()
+
+
+class Mailbox:
+    """Private messages indexed by id, sender, receiver and subject prefix.
+
+    Names and subjects are matched case-insensitively. Lookups return every
+    match, in the order messages were added. Messages are keyed on their
+    folder and id: adding a message already known in the same folder replaces
+    it (e.g. a message that has been read since), while a message sent to
+    oneself is kept once per folder (inbox and sentbox share its id).
+    """
+
+    def __init__(self, messages: Iterable[Message] = ()) -> None:
+        self._messages: dict[Key, Message] = {}
+        self._folders: dict[int, dict[int | None, None]] = {}  # id -> folders
+        self._senders: Index = {}
+        self._receivers: Index = {}
+        self._subjects: Index = {}
+        self.extend(messages)
+
+    # -----------------------------
+    # INDEXES
+    # -----------------------------
+
+    def _index_keys(self, message: Message) -> Iterator[tuple[Index, str]]:
+        yield self._senders, _key(message.sender)
+        receivers = {_key(name) for name in message.receivers}
+        if message.receiver:
+            receivers.add(_key(message.receiver))
+        for receiver in receivers:
+            yield self._receivers, receiver
+        subject = _key(message.subject)
+        for length in SUBJECT_PREFIX_LENGTHS:
+            if length > len(subject):
+                break
+            yield self._subjects, subject[:length]
+
+    def add(self, message: Message) -> None:
+        key = (message.folder_id, message.id)
+        self._remove(key)
+        self._messages[key] = message
+        self._folders.setdefault(message.id, {})[message.folder_id] = None
+        for index, name in self._index_keys(message):
+            index.setdefault(name, {})[key] = None
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        for message in messages:
+            self.add(message)
+
+    def replace_folder(self, folder_id: int, messages: Iterable[Message]) -> None:
+        """Replace the messages of folder ``folder_id`` by a fresh listing of it.
+
+        Messages of the folder missing from ``messages`` were deleted or moved
+        on the board, and are dropped.
+        """
+        messages = list(messages)
+        kept = {m.id for m in messages}
+        for message in list(self):
+            if message.folder_id == folder_id and message.id not in kept:
+                self.discard(message.id, folder_id)
+        self.extend(messages)
+
+    def discard(self, pm_id: int, folder_id: int | None = None) -> None:
+        """Drop message ``pm_id`` of folder ``folder_id``, or of every folder."""
+        folders = self._folders.get(pm_id, {})
+        for folder in [folder_id] if folder_id is not None else list(folders):
+            self._remove((folder, pm_id))
+
+    def _remove(self, key: Key) -> None:
+        message = self._messages.pop(key, None)
+        if message is None:
+            return
+        folders = self._folders[message.id]
+        del folders[message.folder_id]
+        if not folders:
+            del self._folders[message.id]
+        for index, name in self._index_keys(message):
+            keys = index[name]
+            del keys[key]
+            if not keys:
+                del index[name]
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._folders.clear()
+        self._senders.clear()
+        self._receivers.clear()
+        self._subjects.clear()
+
+    # -----------------------------
+    # LOOKUPS
+    # -----------------------------
+
+    def get(self, pm_id: int, folder_id: int | None = None) -> Message | None:
+        """Message ``pm_id`` of folder ``folder_id``, or of the first folder it was seen in."""
+        if folder_id is None:
+            folder_id = next(iter(self._folders.get(pm_id, ())), None)
+        return self._messages.get((folder_id, pm_id))
+
+    def _lookup(self, index: Index, name: str) -> list[Message]:
+        return [self._messages[key] for key in index.get(_key(name), ())]
+
+    def by_sender(self, name: str) -> list[Message]:
+        return self._lookup(self._senders, name)
+
+    def by_receiver(self, name: str) -> list[Message]:
+        return self._lookup(self._receivers, name)
+
+    def by_subject(self, prefix: str) -> list[Message]:
+        """Messages whose subject starts with ``prefix``."""
+        prefix = _key(prefix)
+        if not prefix:
+            return list(self)
+        # plus long préfixe indexé, puis filtre sur le préfixe complet
+        length = max(n for n in SUBJECT_PREFIX_LENGTHS if n <= len(prefix))
+        candidates = self._lookup(self._subjects, prefix[:length])
+        if length == len(prefix):
+            return candidates
+        return [m for m in candidates if _key(m.subject).startswith(prefix)]
+
+    def __contains__(self, pm_id: object) -> bool:
+        return pm_id in self._folders
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages.values())
+
+    def __len__(self) -> int:
+        return len(self._messages)
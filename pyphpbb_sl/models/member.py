@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class Member:
+    uid: int
+    name: str
+    rank: str = ""
+    registered: datetime | None = None
+    posts: int | None = None
+    details: dict[str, str] = field(default_factory=dict)  # every "label: value" of the profile
+
+
+@dataclass(slots=True)
+class MemberRow:
+    """A member, as listed by the memberlist."""
+
+    uid: int
+    name: str
+    rank: str = ""
+    posts: int | None = None
+    joined: datetime | None = None
+    last_visit: datetime | None = None
@@ -1,7 +1,25 @@
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 
+# origine des dates naïves stockées en secondes (MessageStore, MessageArchive)
+EPOCH = datetime(1970, 1, 1)
 
-@dataclass
+
+def naive(moment: datetime) -> datetime:
+    """``moment`` as a naive datetime, aware ones being converted to local time."""
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo is not None else moment
+
+
+def to_seconds(moment: datetime) -> float:
+    """Seconds from ``EPOCH`` to a naive wall-clock time, whatever the local timezone."""
+    return (naive(moment) - EPOCH).total_seconds()
+
+
+def from_seconds(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+@dataclass(slots=True)
 class Message:
     id: int
     subject: str
@@ -10,3 +28,8 @@ class Message:
     receiver: str | None
     content: str | None
     unread: bool
+    # parsed from folder listings
+    receivers: tuple[str, ...] = ()
+    sent_at: datetime | None = None  # naive, in the board display timezone
+    attachment: bool = False
+    folder_id: int | None = None
@@ -0,0 +1,158 @@
+import math
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+
+from .message import Message, from_seconds, to_seconds
+
+Loader = Callable[[Message], Awaitable[Message]]
+
+# ./ucp.php?i=pm&mode=view&f=0&p=11850
+URL_TEMPLATE = "./ucp.php?i=pm&mode=view&f={}&p={}"
+NO_NAME = -1
+NO_FOLDER = -(2**31)
+NO_RECEIVERS: tuple[int, ...] = ()
+
+
+class MessageStore:
+    """Compact, append-only store of message headers.
+
+    Headers are kept in columns: ids, folders, names and dates in arrays,
+    user names stored once in a table, subjects interned, urls rebuilt.
+    A :class:`Message` is only built when accessed. Bodies are not stored with headers: they are
+    loaded on first access by :meth:`content`, through ``loader`` (e.g.
+    ``phpbb.read_private_message``), and the last ``max_bodies`` are kept.
+
+    Args:
+        messages: initial headers.
+        loader: async callable returning the message with its content.
+        max_bodies: number of bodies kept in memory (``None``: no bound).
+    """
+
+    def __init__(
+        self,
+        messages: Iterable[Message] = (),
+        loader: Loader | None = None,
+        max_bodies: int | None = 1024,
+    ) -> None:
+        self.loader = loader
+        self.max_bodies = max_bodies
+        self._ids = array("q")
+        self._folders = array("i")
+        self._senders = array("i")
+        self._receivers = array("i")
+        self._unread = bytearray()
+        self._attachment = bytearray()
+        self._sent_at = array("d")  # see to_seconds, nan if unknown
+        self._recipients: list[tuple[int, ...]] = []  # receivers (name indexes)
+        self._subjects: list[str] = []
+        self._names: list[str] = []
+        self._name_index: dict[str, int] = {}
+        self._rows: dict[int, int] = {}  # id -> row
+        self._urls: dict[int, str] = {}  # urls not matching URL_TEMPLATE
+        self._bodies: OrderedDict[int, str] = OrderedDict()
+        self.extend(messages)
+
+    def _name(self, name: str | None) -> int:
+        if name is None:
+            return NO_NAME
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self._names)
+            self._names.append(name)
+        return index
+
+    def append(self, message: Message) -> None:
+        """Add a message header, or update it if its id is already stored."""
+        folder = NO_FOLDER if message.folder_id is None else message.folder_id
+        if message.url == URL_TEMPLATE.format(folder, message.id):
+            self._urls.pop(message.id, None)
+        else:
+            self._urls[message.id] = message.url
+        row = self._rows.get(message.id)
+        if row is None:
+            row = self._rows[message.id] = len(self._ids)
+            self._ids.append(message.id)
+            # nouvelle ligne, remplie ci-dessous
+            self._folders.append(0)
+            self._senders.append(0)
+            self._receivers.append(0)
+            self._unread.append(0)
+            self._attachment.append(0)
+            self._sent_at.append(0.0)
+            self._recipients.append(NO_RECEIVERS)
+            self._subjects.append("")
+        self._folders[row] = folder
+        self._senders[row] = self._name(message.sender)
+        self._receivers[row] = self._name(message.receiver)
+        self._unread[row] = message.unread
+        self._attachment[row] = message.attachment
+        self._sent_at[row] = math.nan if message.sent_at is None else to_seconds(message.sent_at)
+        self._recipients[row] = tuple(self._name(n) for n in message.receivers) or NO_RECEIVERS
+        self._subjects[row] = sys.intern(message.subject)
+        if message.content is not None:
+            self._keep_body(message.id, message.content)
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def _keep_body(self, pm_id: int, content: str) -> None:
+        self._bodies[pm_id] = content
+        self._bodies.move_to_end(pm_id)
+        if self.max_bodies is not None:
+            while len(self._bodies) > self.max_bodies:
+                self._bodies.popitem(last=False)
+
+    def _message(self, row: int) -> Message:
+        pm_id = self._ids[row]
+        folder = self._folders[row]
+        receiver = self._receivers[row]
+        sent_at = self._sent_at[row]
+        return Message(
+            id=pm_id,
+            subject=self._subjects[row],
+            url=self._urls.get(pm_id) or URL_TEMPLATE.format(folder, pm_id),
+            sender=self._names[self._senders[row]],
+            receiver=None if receiver == NO_NAME else self._names[receiver],
+            content=self._bodies.get(pm_id),
+            unread=bool(self._unread[row]),
+            receivers=tuple(self._names[n] for n in self._recipients[row]),
+            sent_at=None if math.isnan(sent_at) else from_seconds(sent_at),
+            attachment=bool(self._attachment[row]),
+            folder_id=None if folder == NO_FOLDER else folder,
+        )
+
+    def get(self, pm_id: int) -> Message | None:
+        row = self._rows.get(pm_id)
+        return None if row is None else self._message(row)
+
+    async def content(self, pm_id: int) -> str:
+        """Return the body of a message, loading it on first access."""
+        body = self._bodies.get(pm_id)
+        if body is not None:
+            self._bodies.move_to_end(pm_id)
+            return body
+        message = self.get(pm_id)
+        if message is None:
+            raise KeyError(pm_id)
+        if self.loader is None:
+            raise LookupError(f"Body of message {pm_id} not loaded, and no loader")
+        loaded = await self.loader(message)
+        self._unread[self._rows[pm_id]] = loaded.unread
+        self._keep_body(pm_id, loaded.content or "")
+        return loaded.content or ""
+
+    def __contains__(self, pm_id: object) -> bool:
+        return pm_id in self._rows
+
+    def __getitem__(self, index: int) -> Message:
+        """Message at position ``index`` (insertion order)."""
+        return self._message(range(len(self._ids))[index])
+
+    def __iter__(self) -> Iterator[Message]:
+        return (self._message(row) for row in range(len(self._ids)))
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -1,3 +1,14 @@
+from .dates import parse_date
 from .forum import parse_sub_forums
+from .html import parse_html
+from .member import parse_member_profile, parse_memberlist
+from .pagination import parse_pagination
 
-__all__ = ["parse_sub_forums"]
+__all__ = [
+    "parse_date",
+    "parse_html",
+    "parse_member_profile",
+    "parse_memberlist",
+    "parse_pagination",
+    "parse_sub_forums",
+]
@@ -0,0 +1,78 @@
+import re
+from datetime import datetime, timedelta
+
+# noms abrégés des forums en français -> noms anglais de strptime ("mar." mardi, "mars")
+FRENCH_NAMES = {
+    "lun.": "Mon",
+    "mar.": "Tue",
+    "mer.": "Wed",
+    "jeu.": "Thu",
+    "ven.": "Fri",
+    "sam.": "Sat",
+    "dim.": "Sun",
+    "janv.": "Jan",
+    "févr.": "Feb",
+    "mars": "Mar",
+    "avr.": "Apr",
+    "mai": "May",
+    "juin": "Jun",
+    "juil.": "Jul",
+    "août": "Aug",
+    "sept.": "Sep",
+    "oct.": "Oct",
+    "nov.": "Nov",
+    "déc.": "Dec",
+}
+WORD_PATTERN = re.compile(r"[^\W\d]+\.?")
+RELATIVE_PATTERN = re.compile(
+    r"^(?P<day>today|yesterday|aujourd[’']hui|hier)\s*,?\s*(?P<rest>.+)$", re.IGNORECASE
+)
+DATE_FORMATS = (
+    "%a %b %d, %Y %I:%M %p",  # phpBB default, "D M d, Y g:i a"
+    "%a %b %d, %Y %H:%M",
+    "%a %d %b %Y %H:%M",  # "lun. 1 janv. 2024 15:04"
+    "%a %d %b %Y, %H:%M",
+    "%d %b %Y, %H:%M",
+    "%d %b %Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%Y-%m-%d %H:%M",
+)
+TIME_FORMATS = ("%I:%M %p", "%H:%M")
+
+
+def _normalize(text: str) -> str:
+    def english(match: re.Match[str]) -> str:
+        word = match.group(0)
+        return FRENCH_NAMES.get(word.casefold(), word)
+
+    text = WORD_PATTERN.sub(english, text.replace("\xa0", " "))
+    return " ".join(text.replace(" ,", ",").split())
+
+
+def _strptime(text: str, formats: tuple[str, ...]) -> datetime | None:
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_date(text: str, now: datetime | None = None) -> datetime | None:
+    """Parse a date as displayed by phpBB, in English or French.
+
+    Relative dates (``Today, 3:04 pm``, ``Hier, 15:04``) are resolved from
+    ``now``. The result is naive, in the timezone the board displays.
+    Return ``None`` when the format is unknown.
+    """
+    text = text.strip()
+    relative = RELATIVE_PATTERN.match(text)
+    if relative:
+        moment = _strptime(_normalize(relative["rest"]), TIME_FORMATS)
+        if moment is None:
+            return None
+        day = (now or datetime.now()).date()
+        if relative["day"].casefold() in ("yesterday", "hier"):
+            day -= timedelta(days=1)
+        return datetime.combine(day, moment.time())
+    return _strptime(_normalize(text), DATE_FORMATS)
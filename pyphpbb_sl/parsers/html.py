@@ -0,0 +1,22 @@
+import codecs
+
+from selectolax.parser import HTMLParser
+
+
+def parse_html(content: bytes, charset: str | None = None) -> HTMLParser:
+    """Parse a raw response body.
+
+    selectolax works on UTF-8 bytes, so a UTF-8 body is handed over as is,
+    without decoding it to ``str`` first. Bodies declared in another charset
+    are decoded in Python, and bodies without declared charset are left to
+    selectolax encoding detection (``<meta charset>`` included).
+    """
+    if charset:
+        try:
+            codec = codecs.lookup(charset).name
+        except LookupError:
+            return HTMLParser(content)
+        if codec != "utf-8":
+            return HTMLParser(content.decode(codec, "replace"))
+        return HTMLParser(content, detect_encoding=False)
+    return HTMLParser(content)
@@ -0,0 +1,113 @@
+import re
+
+from selectolax.parser import HTMLParser, Node
+
+from pyphpbb_sl.models import Member, MemberRow
+
+from .dates import parse_date
+
+UID_PATTERN = re.compile(r"[?&]u=(?P<UID>\d+)")
+# libellés du profil, en français et en anglais
+NAME_LABELS = {"nom d’utilisateur", "nom d'utilisateur", "username"}
+REGISTERED_LABELS = {"inscription", "inscrit le", "joined"}
+POSTS_LABELS = {"messages", "total posts", "posts"}
+
+
+# classes des colonnes (th) de la liste des membres
+MEMBERLIST_COLUMNS = ("name", "posts", "joined", "active")
+
+
+def _label(text: str) -> str:
+    return text.strip().rstrip(":").strip().casefold()
+
+
+def parse_member_profile(root: HTMLParser, name: str = "") -> Member | None:
+    """Parse a ``memberlist.php?mode=viewprofile`` page.
+
+    Return ``None`` when the page is not a profile (unknown member).
+    """
+    link = root.css_first("link[rel=canonical]")
+    match = UID_PATTERN.search(link.attributes.get("href") or "") if link else None
+    if not match:
+        return None
+
+    details = {}
+    for dl in root.css("dl.details"):
+        label = None
+        for node in dl.iter():
+            if node.tag == "dt":
+                label = node.text().strip().rstrip(":").strip()
+            elif node.tag == "dd" and label:
+                details[label] = " ".join(node.text().split())
+                label = None
+
+    member = Member(uid=int(match["UID"]), name=name)
+    rank = root.css_first("dd")  # premier <dd> : le rang, sous l'avatar
+    member.rank = rank.text().strip() if rank else ""
+    member.details = details
+    for label, value in details.items():
+        key = _label(label)
+        if key in NAME_LABELS:
+            member.name = value
+        elif key in REGISTERED_LABELS:
+            member.registered = parse_date(value)
+        elif key in POSTS_LABELS:
+            member.posts = _count(value)
+    return member
+
+
+def _count(text: str) -> int | None:
+    """Leading number of a cell, e.g. ``1 234 | Rechercher...``."""
+    number = re.match(r"[\d\s.,\xa0]+", text.strip())
+    digits = re.sub(r"\D", "", number.group(0)) if number else ""
+    return int(digits) if digits else None
+
+
+def parse_memberlist(root: HTMLParser) -> list[MemberRow]:
+    """Parse the members of a ``memberlist.php`` page.
+
+    Columns are found by the classes of the table headers (``name``,
+    ``posts``, ``joined``, ``active``), so hidden or reordered columns
+    are supported.
+    """
+    table = root.css_first("table#memberlist, table.memberlist")
+    if table is None:
+        return []
+    columns = {}
+    for index, th in enumerate(table.css("thead th")):
+        classes = (th.attributes.get("class") or "").split()
+        for column in MEMBERLIST_COLUMNS:
+            if column in classes:
+                columns[column] = index
+    columns.setdefault("name", 0)
+
+    members = []
+    for tr in table.css("tbody tr"):
+        cells = tr.css("td")
+
+        def text(column: str, cells: list[Node] = cells) -> str | None:
+            index = columns.get(column)
+            return cells[index].text() if index is not None and index < len(cells) else None
+
+        if text("name") is None:
+            continue
+        cell = cells[columns["name"]]
+        user = cell.css_first("a.username, a.username-coloured")
+        match = UID_PATTERN.search(user.attributes.get("href") or "") if user else None
+        if user is None or not match:
+            continue  # "Aucun membre..."
+        member = MemberRow(uid=int(match["UID"]), name=user.text().strip())
+        rank = cell.css_first(".rank-img")
+        if rank is not None:
+            image = rank.css_first("img")
+            member.rank = rank.text().strip() or (
+                image.attributes.get("alt") or "" if image else ""
+            )
+        if (posts := text("posts")) is not None:
+            member.posts = _count(posts)
+        if (joined := text("joined")) is not None:
+            member.joined = parse_date(joined)
+        if (active := text("active")) is not None:
+            member.last_visit = parse_date(active)
+        members.append(member)
+    return members
@@ -0,0 +1,24 @@
+import math
+import re
+
+from selectolax.parser import HTMLParser
+
+START_PATTERN = re.compile(r"[?&](?:amp;)?start=(?P<start>\d+)")
+
+
+def parse_pagination(root: HTMLParser) -> list[int]:
+    """Return the ``start`` offsets of the next pages, parsed on a first page.
+
+    phpBB only links a few pages (``1 2 3 … 20``), so offsets are rebuilt
+    from the page size and the offset of the last page.
+    """
+    starts = set()
+    for node in root.css("div.pagination a[href*='start=']"):
+        match = START_PATTERN.search(node.attributes.get("href") or "")
+        if match:
+            starts.add(int(match["start"]))
+    starts.discard(0)
+    if not starts:
+        return []
+    per_page = math.gcd(*starts)
+    return list(range(per_page, max(starts) + 1, per_page))
@@ -2,17 +2,35 @@
 """Module to interract with phpBB forum."""
 
 import asyncio
+import dataclasses
 import logging
 import re
 import sys
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from datetime import datetime
 from functools import partialmethod
 from urllib.error import HTTPError
 from urllib.parse import urljoin
 
-from pyphpbb_sl.models import Message, SubForum
-from pyphpbb_sl.parsers import parse_sub_forums
+from selectolax.parser import HTMLParser
+
+from pyphpbb_sl.models import Mailbox, Member, MemberRow, Message, SubForum
+from pyphpbb_sl.models.message import naive
+from pyphpbb_sl.parsers import (
+    parse_date,
+    parse_member_profile,
+    parse_memberlist,
+    parse_pagination,
+    parse_sub_forums,
+)
 
 from .browser import Browser
+from .cache import HTTPCache
+from .hooks import operation
+from .uids import UIDCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,29 +43,82 @@ MESSAGE_COMPOSE = {"i": "pm", "mode": "compose"}
 MESSAGE_COMPOSE_DELETE = dict(MESSAGE_COMPOSE, **{"action": "delete"})
 INBOX = {"i": "pm", "folder": "inbox"}
 SENTBOX = {"i": "pm", "folder": "sentbox"}
+PM_VIEW_FOLDER = {"i": "pm", "mode": "view", "action": "view_folder"}
+MARK_DELETE = "delete_marked"
+DELETE_CHUNK = 50
+PREFETCH_PAGES = 2
+READ_CONCURRENCY = 8
+PM_MAX_RECIPIENTS = 50
+MEMBERS_CONCURRENCY = 8
+# memberlist sort keys (sk)
+MEMBER_SORT_KEYS = {"name": "a", "joined": "c", "posts": "d", "last_visit": "k", "rank": "m"}
 SUBMIT = "Envoyer"
-COOKIE_U_PATTERN = r"phpbb\d?_.*_u"  # new cookie regex
-COOKIE_SID_PATTERN = r"phpbb\d?_.*_sid"  # new cookie regex
 PM_ID_PATTERN = re.compile(r"f=(?P<F>-?\d+)&p=(?P<P>\d+)")
+SENT_FOLDERS = (-1, -2)  # sentbox, outbox
+FOLDER_IDS = {"inbox": 0, "sentbox": -1, "outbox": -2}
 USER_ID_PATTERN = re.compile(r"&u=(?P<UID>\d+)")
+# pm_max_recipients dépassé, ou pas de permission u_masspm (1 destinataire)
+TOO_MANY_RECIPIENTS_PATTERN = re.compile(r"too many recipients|trop de destinataires", re.I)
+
+
+class _TooManyRecipients(Exception):
+    """Raised when the board refuses a PM to several receivers for their number."""
+
+
+def _gathered[T](results: list[T | BaseException]) -> list[T | Exception]:
+    """Results of ``asyncio.gather(..., return_exceptions=True)``, failures included.
+
+    Other base exceptions (CancelledError, KeyboardInterrupt) are not a
+    failed task, and are raised again.
+    """
+    gathered: list[T | Exception] = []
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+        gathered.append(result)
+    return gathered
 
 
 class PhpBB:
     """Class to interract with phpBB forum."""
 
     FORM_ID = "postform"
+    # phpBB default form token lifetime is 7200 s, keep a safety margin
+    COMPOSE_FORM_TTL = 3600.0
     # private_mess_url = 'ucp.php?i=pm&mode=compose'
 
-    def __init__(self, host):
+    def __init__(
+        self, host, session_store=None, logout_on_exit=True, uid_cache=None, **browser_options
+    ):
         """Init object with host url.
 
         Args:
             host (str): url of phpbb forum
+            session_store (SessionStore): optional store of session cookies.
+                ``login`` then reuses a stored session when it is still valid.
+            logout_on_exit (bool): log out when leaving the context manager.
+                Set it to False to keep the stored session alive for next run.
+            uid_cache (UIDCache): cache of member UIDs, learnt from every
+                page showing member links, used to send PMs without asking
+                phpBB for the receiver UID. In memory by default, saved on
+                close when it has a path.
+            **browser_options: forwarded to :class:`Browser` (``limits``,
+                ``http2``, ``transport``, ``rate_limiter``, ``cache``...).
+                Pass the same ``transport`` to many ``PhpBB`` objects to
+                share connections.
         """  # noqa: E501
         self.host = host.rstrip("/")  # optionnel mais propre
+        self.session_store = session_store
+        self.logout_on_exit = logout_on_exit
+        self.username = None
         self.unread_messages = []  # Private Messages Inbox unread messages
+        self.mailbox = Mailbox()  # every message fetched, indexed
+        self.uid_cache = uid_cache if uid_cache is not None else UIDCache()
+        self.last_seen_ids: dict[str, int] = {}  # highest PM id seen, by folder (sync_box)
+        self._member_requests: dict[str, asyncio.Future] = {}  # profiles being fetched
+        self._compose_form: tuple[str | None, float, dict] | None = None  # (sid, expires, form)
         try:
-            self.browser = Browser(base_url=self.host)
+            self.browser = Browser(base_url=self.host, **browser_options)
         except HTTPError as e:  # pragma: no cover
             logger.error(e)
             sys.exit(1)
@@ -58,7 +129,10 @@ class PhpBB:
 
     async def __aexit__(self, type_, value, traceback):
         if self.is_logged():
-            await self.logout()
+            if self.logout_on_exit:
+                await self.logout()
+            else:
+                self._save_session()
         await self.close()
 
     def is_logged(self):
@@ -82,25 +156,44 @@ class PhpBB:
         return False
 
     def _get_user_id(self) -> int | None:
-        cookies = self.browser.list_cookies()
-
-        for cookie in cookies:
-            if re.search(COOKIE_U_PATTERN, cookie.key):
-                return int(cookie.value) if str(cookie.value).isdigit() else None
-
-        return None
+        return self.browser.session.user_id
 
     def _get_sid(self) -> str | None:
-        cookies = self.browser.list_cookies()
+        return self.browser.session.sid
+
+    def _session_key(self) -> str:
+        return f"{self.host}|{self.username}"
 
-        for cookie in cookies:
-            if cookie.key.endswith("_sid"):
-                return str(cookie.value) if cookie.value else None
+    def _save_session(self):
+        if self.session_store is not None and self.username:
+            self.session_store.save(self._session_key(), self.browser.export_cookies())
 
-        return None
+    async def _restore_session(self) -> bool:
+        """Load the stored session and check it with a single request."""
+        cookies = self.session_store.load(self._session_key())
+        if not cookies:
+            return False
+        self.browser.import_cookies(cookies)
+        if self.browser.session.logged_in:
+            root = await self.browser.get_html(self.host, use_cache=False)
+            # only a logged-in user gets a logout link
+            if self.browser.session.logged_in and root.css_first('a[href*="mode=logout"]'):
+                logger.info("Stored session restored for %s", self.username)
+                return True
+        logger.info("Stored session expired for %s", self.username)
+        self.browser.clear_cookies()
+        self.session_store.delete(self._session_key())
+        return False
 
+    @operation()
     async def login(self, username, password):
-        """Log in phpBB forum."""
+        """Log in phpBB forum.
+
+        With a session store, a stored and still valid session is reused.
+        """
+        self.username = username
+        if self.session_store is not None and await self._restore_session():
+            return True
         try:
             forum_ucp = urljoin(self.host, UCP_URL)
             payload = await self.browser.select_tag(forum_ucp, "input")
@@ -108,14 +201,19 @@ class PhpBB:
             #     print(key, value)
             payload["username"] = username
             payload["password"] = password
-            await asyncio.sleep(1)
             await self.browser.post(forum_ucp, params=LOGIN_MODE, data=payload)
-            return self.is_logged()
+            logged = self.is_logged()
+            if logged:
+                if (user_id := self._get_user_id()) is not None:
+                    self.uid_cache.put(username, user_id)
+                self._save_session()
+            return logged
 
         except HTTPError as e:  # pragma: no cover
             logger.error(e)
             return False
 
+    @operation()
     async def logout(self):
         """Log out of phpBB forum."""
         try:
@@ -128,6 +226,8 @@ class PhpBB:
                 # headers=headers,
                 params=params,
             )
+            if self.session_store is not None and self.username:
+                self.session_store.delete(self._session_key())
             return self.is_logged_out()
         except HTTPError as e:  # pragma: no cover
             logger.error(e)
@@ -135,6 +235,7 @@ class PhpBB:
 
     async def close(self):
         """Close request session (HTTP connection)."""
+        self.uid_cache.save()
         try:
             await self.browser.close()
             logger.info("Browser closed")
@@ -142,22 +243,42 @@ class PhpBB:
             logger.error(e)
             sys.exit(1)
 
+    async def _get_compose_form(self, url) -> dict:
+        """Return a copy of the compose form, fetched once per session.
+
+        The hidden fields (form_token, creation_time...) stay valid for the
+        whole form token lifetime, for the same session id.
+        """
+        sid = self._get_sid()
+        if self._compose_form is not None:
+            cached_sid, expires, form = self._compose_form
+            if cached_sid == sid and time.monotonic() < expires:
+                return {"action": form["action"], "values": dict(form["values"])}
+
+        form = await self.browser.get_form(url, PhpBB.FORM_ID, params=MESSAGE_COMPOSE)
+        self._compose_form = (sid, time.monotonic() + PhpBB.COMPOSE_FORM_TTL, form)
+        return {"action": form["action"], "values": dict(form["values"])}
+
+    def _has_compose_form(self) -> bool:
+        return self._compose_form is not None and time.monotonic() < self._compose_form[1]
+
     async def _make_add_receiver_payload(self, url, receiver):
-        form = await self.browser.get_form(url, PhpBB.FORM_ID, params=MESSAGE_COMPOSE)  # noqa: E501
+        form = await self._get_compose_form(url)
         form["values"]["username_list"] = receiver
         form["values"]["add_to"] = "Ajouter"
         form["values"]["addbbcode20"] = 100
-        del form["values"]["icon"]
+        form["values"].pop("icon", None)
         url = urljoin(self.host, form["action"])
         payload = form["values"]
         return url, payload
 
-    async def _make_private_message_payload(self, url, receiverid, subject, message):  # noqa: E501
-        form = await self.browser.get_form(url, PhpBB.FORM_ID)
+    async def _make_private_message_payload(self, url, receiver_ids, subject, message):  # noqa: E501
+        form = await self._get_compose_form(url)
         form["values"]["subject"] = subject
         form["values"]["message"] = message
         form["values"]["addbbcode20"] = 100
-        form["values"][f"address_list[u][{receiverid}]"] = "to"
+        for receiverid in receiver_ids:
+            form["values"][f"address_list[u][{receiverid}]"] = "to"
         form["values"]["icon"] = 0
         # del form['values']['icon']
         form["values"]["post"] = SUBMIT
@@ -207,104 +328,413 @@ class PhpBB:
 
         return int(match.group("UID"))
 
+    def _learn_uids(self, root) -> None:
+        """Cache the UID of every member linked in a page."""
+        for node in root.css("a.username, a.username-coloured"):
+            match = USER_ID_PATTERN.search(node.attributes.get("href") or "")
+            if match:
+                self.uid_cache.put(node.text().strip(), int(match["UID"]))
+
+    @staticmethod
+    def parse_resp_receivers(html: str) -> dict[str, int]:
+        """Parse html response after adding receivers for private message.
+
+        Return ``{username: UID}`` of the recipients listed in the form.
+        """
+        root = Browser.html2root(html)
+        receivers = {}
+        for item in root.css("ul.recipients li"):
+            user = item.css_first("a.username, a.username-coloured")
+            remove = item.css_first("[name^='remove_u[']")
+            if user is None or remove is None:
+                continue  # groupe, ou liste vide
+            match = re.search(r"remove_u\[(?P<UID>\d+)\]", remove.attributes.get("name") or "")
+            if match:
+                receivers[user.text().strip()] = int(match["UID"])
+        return receivers
+
+    @operation()
     async def send_private_message(self, receiver: str | None, subject: str, message: str) -> bool:  # noqa: E501
-        """Send private message."""
+        """Send private message.
+
+        The compose form is reused between messages. If phpBB refuses the
+        cached form, a fresh one is fetched and the message is sent again.
+        """
         logger.info("Trying to send private message to %s", receiver)
+        known = receiver is not None and receiver in self.uid_cache
+        cached = self._has_compose_form() or known
+        if await self._send_private_message(receiver, subject, message):
+            return True
+        if not cached:
+            return False
+        logger.info("Cached compose form or UID refused, retrying with fresh ones")
+        if known and receiver is not None:
+            self.uid_cache.discard(receiver)
+        return await self._send_private_message(receiver, subject, message)
+
+    async def _send_private_message(self, receiver, subject, message) -> bool:
         url = urljoin(self.host, UCP_URL)
-        urlrep1, payload1 = await self._make_add_receiver_payload(url, receiver)
-        await asyncio.sleep(2)
+        receiverid = self.uid_cache.get(receiver) if receiver is not None else None
+        if receiverid is None:
+            url, payload1 = await self._make_add_receiver_payload(url, receiver)
 
-        # Add receiver
-        resp = await self.browser.post(
-            urlrep1,
-            # headers=headers,
-            data=payload1,
-        )
+            # Add receiver
+            resp = await self.browser.post(
+                url,
+                # headers=headers,
+                data=payload1,
+            )
 
-        receiverid = PhpBB.parse_resp_find_receiver_id(resp.text)
+            receiverid = PhpBB.parse_resp_find_receiver_id(resp.text)
 
-        if receiverid is None:  # pragma: no cover
-            return False
+            if receiverid is None:  # pragma: no cover
+                self._compose_form = None
+                return False
+            if receiver is not None:
+                self.uid_cache.put(receiver, receiverid)
+
+        return await self._post_private_message(url, [receiverid], subject, message)
 
+    async def _post_private_message(self, url, receiver_ids, subject, message) -> bool:
         urlrep2, payload2 = await self._make_private_message_payload(
-            urlrep1, receiverid, subject, message
+            url, receiver_ids, subject, message
         )  # noqa: E501
 
-        await asyncio.sleep(2)
-
         # Send message
-        await self.browser.post(
+        resp = await self.browser.post(
             urlrep2,
             # headers=headers,
             data=payload2,
         )
+        error = Browser.html2root(resp.content).css_first("p.error")
+        if error is not None:
+            text = error.text().strip()
+            logger.error("Message not sent : %s", text)
+            self._compose_form = None
+            if len(receiver_ids) > 1 and TOO_MANY_RECIPIENTS_PATTERN.search(text):
+                raise _TooManyRecipients(text)
+            return False
         return True
 
+    @operation()
+    async def send_private_messages(
+        self,
+        receivers: list[str],
+        subject: str,
+        message: str,
+        max_recipients: int = PM_MAX_RECIPIENTS,
+    ) -> dict[str, bool]:
+        """Send the same private message to many receivers.
+
+        Receivers are packed by ``max_recipients`` (the board
+        ``pm_max_recipients``): each pack costs one POST resolving the UIDs
+        missing from ``uid_cache``, and one POST sending the message to all
+        of them. If the board refuses a pack for its number of recipients
+        (lower ``pm_max_recipients``, or no ``u_masspm`` permission), the
+        pack and the next ones are halved, down to single sends.
+        Return ``{receiver: sent}``, unknown receivers being ``False``.
+        """
+        outcomes: dict[str, bool] = {}
+        names = list(dict.fromkeys(receivers))
+        start = 0
+        while start < len(names):
+            chunk = names[start : start + max_recipients]
+            logger.info("Trying to send private message to %d receivers", len(chunk))
+            try:
+                outcomes.update(await self._send_pack(chunk, subject, message))
+            except _TooManyRecipients:
+                max_recipients = max(1, len(chunk) // 2)
+                logger.info("Too many recipients, retrying by packs of %d", max_recipients)
+                continue
+            start += len(chunk)
+        return outcomes
+
+    async def _send_pack(self, receivers, subject, message) -> dict[str, bool]:
+        known = [name for name in receivers if name in self.uid_cache]
+        cached = bool(self._has_compose_form() or known)
+        sent = await self._send_private_messages(receivers, subject, message)
+        if not any(sent.values()) and cached:
+            logger.info("Cached compose form or UIDs refused, retrying with fresh ones")
+            for name in known:
+                self.uid_cache.discard(name)
+            sent = await self._send_private_messages(receivers, subject, message)
+        return sent
+
+    async def _send_private_messages(self, receivers, subject, message) -> dict[str, bool]:
+        outcomes = dict.fromkeys(receivers, False)
+        url = urljoin(self.host, UCP_URL)
+        uids = {name: self.uid_cache.get(name) for name in receivers}
+        unknown = [name for name, uid in uids.items() if uid is None]
+        if unknown:
+            url, payload1 = await self._make_add_receiver_payload(url, "\n".join(unknown))
+            resp = await self.browser.post(url, data=payload1)
+            found = PhpBB.parse_resp_receivers(resp.text)
+            self.uid_cache.update(found)
+            found = {name.casefold(): uid for name, uid in found.items()}
+            for name in unknown:
+                uids[name] = found.get(name.casefold())
+                if uids[name] is None:
+                    logger.error("Receiver %s not found", name)
+        uids = {name: uid for name, uid in uids.items() if uid is not None}
+        if not uids:
+            self._compose_form = None
+            return outcomes
+
+        if await self._post_private_message(url, list(uids.values()), subject, message):
+            outcomes.update(dict.fromkeys(uids, True))
+        return outcomes
+
     @staticmethod
-    def _parse_inbox_mess(node) -> Message:
+    def _parse_inbox_mess(node, owner: str | None = None) -> Message:
+        """Parse a row of a folder listing.
+
+        In the inbox, the member linked is the sender. In the sentbox and the
+        outbox, members linked are the receivers, and ``owner`` the sender.
+        """
         raw = node.css_first("a.topictitle")
-        sender_node = node.css_first("a.username, a.username-coloured")
+        users = [n.text().strip() for n in node.css("a.username, a.username-coloured")]
 
         subject = raw.text() if raw else ""
         url = raw.attributes.get("href") if raw else ""
-        sender = sender_node.text() if sender_node else ""
 
-        # Extract message ID from URL
+        # Extract message ID and folder ID from URL
         match = PM_ID_PATTERN.search(url)
         msg_id = int(match.group("P")) if match else -1
+        folder_id = int(match.group("F")) if match else None
+
+        if folder_id in SENT_FOLDERS:
+            sender, receivers = owner or "", tuple(users)
+        else:
+            sender, receivers = (users[0] if users else ""), ()
 
         return Message(
             id=msg_id,
             subject=subject,
             url=url,
             sender=sender,
-            receiver=None,  # inbox → receiver = toi
+            receiver=receivers[0] if receivers else None,  # inbox → receiver = toi
             content=None,
-            unread=True,
+            unread="pm_unread" in (node.attributes.get("class") or ""),
+            receivers=receivers,
+            sent_at=PhpBB._parse_sent_at(node),
+            attachment=node.css_first(".fa-paperclip, .icon_topic_attach") is not None,
+            folder_id=folder_id,
         )
 
-    async def fetch_box(self, class_: str, box=INBOX):
-        """Fetch private messages inbox and return short descriptions."""
+    @staticmethod
+    def _parse_sent_at(node) -> datetime | None:
+        """Naive date of a listing row, as displayed by the board.
 
+        Read from a ``<time>`` element or from the text after "»". The UTC
+        ``datetime`` attribute is only used when the text cannot be parsed,
+        converted to local time.
+        """
+        time_node = node.css_first("time[datetime]")
+        if time_node is not None:
+            if (shown := parse_date(time_node.text())) is not None:
+                return shown
+            try:
+                return naive(datetime.fromisoformat(time_node.attributes["datetime"] or ""))
+            except ValueError:
+                pass
+        inner = node.css_first("div.list-inner") or node
+        text = inner.text()
+        return parse_date(text.rsplit("»", 1)[1]) if "»" in text else None
+
+    @operation()
+    async def iter_box(
+        self,
+        class_: str | None = None,
+        box: dict = INBOX,
+        prefetch: int = PREFETCH_PAGES,
+        cache: HTTPCache | None = None,
+    ) -> AsyncGenerator[Message, None]:
+        """Iterate over the messages of every page of a private messages folder.
+
+        Messages are yielded as pages are parsed, while the next ``prefetch``
+        pages are already downloading (``0`` downloads each page when needed).
+        ``class_`` (``pm_unread``, ``pm_read``) filters rows, ``None`` yields them all.
+        ``cache`` replaces the browser cache for these pages.
+        """
         url = urljoin(self.host, UCP_URL)
+        async with aclosing(self._iter_pages(url, box, prefetch, cache)) as pages:
+            async for root in pages:
+                for message in PhpBB._parse_box_page(root, class_, self.username):
+                    yield message
+
+    async def _iter_pages(
+        self, url: str, params: dict, prefetch: int, cache: HTTPCache | None = None
+    ) -> AsyncGenerator[HTMLParser, None]:
+        """Iterate over the parsed pages of a paginated list (``start`` parameter).
+
+        The offsets of the next pages are read from the first one, and the
+        next ``prefetch`` pages are downloaded while a page is processed.
+        """
+        first = await self.browser.get_html(url, params=params, cache=cache)
+        pending = deque(parse_pagination(first))
+        pages: deque[asyncio.Task] = deque()
 
-        # get_html() retourne déjà un HTMLParser
-        root = await self.browser.get_html(url, params=box)
+        def schedule() -> None:
+            while pending and len(pages) < prefetch:
+                page_params = dict(params, start=pending.popleft())
+                page = self.browser.get_html(url, params=page_params, cache=cache)
+                pages.append(asyncio.create_task(page))
 
-        # Sélectionne tous les <dl class="pm_unread"> ou autre class_
-        raw_unread_list = root.css(f"dl.{class_}")
+        root: HTMLParser | None = first
+        try:
+            while root is not None:
+                schedule()
+                self._learn_uids(root)
+                yield root
+                if pages:
+                    root = await pages.popleft()
+                elif pending:
+                    root = await self.browser.get_html(
+                        url, params=dict(params, start=pending.popleft()), cache=cache
+                    )
+                else:
+                    root = None
+        finally:
+            for task in pages:
+                task.cancel()
+
+    @staticmethod
+    def _parse_box_page(root, class_: str | None, owner: str | None = None) -> list[Message]:
+        # un seul sélecteur, pour garder l'ordre du dossier
+        rows = root.css(f"dl.{class_}" if class_ else "li.row dl")
+        return [PhpBB._parse_inbox_mess(item, owner) for item in rows]
 
-        self.unread_messages = [PhpBB._parse_inbox_mess(item) for item in raw_unread_list]
+    @operation()
+    async def fetch_box(self, class_: str, box=INBOX):
+        """Fetch private messages of all pages of a box, and return short descriptions.
 
+        Every row is parsed, and replaces the messages of the folder in
+        ``mailbox``: messages deleted on the board are dropped from it.
+        """
+        messages = [message async for message in self.iter_box(None, box)]
+        folder = str(box.get("folder", "inbox"))
+        folder_id = FOLDER_IDS.get(folder, int(folder) if folder.isdigit() else None)
+        if folder_id is None:
+            self.mailbox.extend(messages)
+        else:
+            self.mailbox.replace_folder(folder_id, messages)
+        unread = class_ == "pm_unread"  # sinon pm_read
+        self.unread_messages = [m for m in messages if m.unread == unread]
         return self.unread_messages
 
+    @operation()
+    async def sync_box(self, box=INBOX) -> list[Message]:
+        """Return the messages of a box received since the previous sync.
+
+        Folders list newest messages first, so pages are read only until a
+        message id already seen (see ``last_seen_ids``) shows up. The first
+        sync of a box returns all its messages. Read/unread changes of known
+        messages are not reported.
+        """
+        folder = box.get("folder", "inbox")
+        last_seen = self.last_seen_ids.get(folder, 0)
+        delta = await self.fetch_since(last_seen, box)
+        self.mailbox.extend(delta)
+        if delta:
+            self.last_seen_ids[folder] = max(last_seen, *(m.id for m in delta))
+        return delta
+
+    @operation()
+    async def fetch_since(
+        self, last_id: int, box: dict = INBOX, cache: HTTPCache | None = None
+    ) -> list[Message]:
+        """Return the messages of a box with an id above ``last_id``, newest first.
+
+        Pages are read only until an older message shows up. Unlike
+        :meth:`sync_box`, no state of the session is used or updated: each
+        consumer (watcher, archive...) keeps its own ``last_id``.
+        """
+        messages = []
+        prefetch = 0 if last_id else PREFETCH_PAGES
+        # aclosing : les pages préchargées sont annulées dès le break
+        async with aclosing(self.iter_box(None, box, prefetch, cache)) as listing:
+            async for message in listing:
+                if message.id <= last_id:
+                    break
+                messages.append(message)
+        return messages
+
     fetch_unread_messages = partialmethod(fetch_box, "pm_unread")
     fetch_read_messages = partialmethod(fetch_box, "pm_read")
     fetch_sent_messages = partialmethod(fetch_box, "pm_read", box=SENTBOX)
 
-    def find_expected_message_by_user(self, sender_name: str):
-        """Find message in unread_messages by sender name. Return first found."""
+    def find_expected_message_by_user(self, sender_name: str) -> Message | None:
+        """Find an unread received message by sender name. Return the first found.
+
+        Looks up the messages of the last fetch (or sync) of each folder.
+        """
         return next(
-            (message for message in self.unread_messages if message.sender == sender_name),
+            (
+                m
+                for m in self.mailbox.by_sender(sender_name)
+                if m.unread and m.folder_id not in SENT_FOLDERS
+            ),
             None,
         )
 
+    @operation()
     async def read_private_message(self, message: Message) -> Message:
         url = urljoin(self.host, message.url)
         root = await self.browser.get_html(url)
+        self._learn_uids(root)
 
         content_node = root.css_first("div.content")
         content = content_node.text().strip() if content_node else ""
 
-        return Message(
-            id=message.id,
-            subject=message.subject,
-            url=message.url,
-            sender=message.sender,
-            receiver=message.receiver,
-            content=content,
-            unread=False,
-        )
+        message = dataclasses.replace(message, content=content, unread=False)
+        if message.id in self.mailbox:
+            self.mailbox.add(message)
+        return message
+
+    @operation()
+    async def read_many(
+        self, messages: list[Message], concurrency: int = READ_CONCURRENCY
+    ) -> list[Message | Exception]:
+        """Read given private messages, ``concurrency`` at a time.
+
+        Results are in the order of ``messages``. A message that could not be
+        read is replaced by the exception raised, the others are still read.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def read(message: Message) -> Message:
+            async with semaphore:
+                return await self.read_private_message(message)
+
+        return _gathered(await asyncio.gather(*(read(m) for m in messages), return_exceptions=True))
+
+    @operation()
+    async def iter_read(self, messages: list[Message], concurrency: int = READ_CONCURRENCY):
+        """Read given private messages, and yield ``(message, result)`` as they complete.
+
+        ``result`` is the read message, or the exception raised while reading it.
+        At most ``concurrency`` reads are in flight.
+        """
+        todo = iter(messages)
+        running: dict[asyncio.Task, Message] = {}
+
+        def schedule() -> None:
+            for message in todo:
+                running[asyncio.create_task(self.read_private_message(message))] = message
+                if len(running) >= concurrency:
+                    return
+
+        try:
+            schedule()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    message = running.pop(task)
+                    yield message, task.exception() or task.result()
+                schedule()
+        finally:
+            for task in running:
+                task.cancel()
 
     @staticmethod
     def _extract_mp_number_id(message: Message) -> tuple[int, int]:
@@ -331,6 +761,7 @@ class PhpBB:
         m = re.search(r"\d+", text)
         return int(m.group(0)) if m else 0
 
+    @operation()
     async def delete_mp(self, message: Message) -> bool:
         """Delete given private message."""
         url, payload = await self._make_delete_mp_payload(message)
@@ -339,9 +770,53 @@ class PhpBB:
             # headers=headers,
             data=payload,
         )
+        self.mailbox.discard(message.id, message.folder_id)
         logging.info("message deleted : %s", message.url[-7:])
         return True
 
+    @operation()
+    async def delete_many(self, messages: list[Message], chunk_size: int = DELETE_CHUNK) -> int:
+        """Delete given private messages, by chunks of marked messages.
+
+        Messages are grouped by folder, then each chunk is marked and
+        deleted with a single confirmation (2 requests per chunk, instead of
+        2 requests per message). Return the number of deleted messages.
+        """
+        by_folder: dict[int, list[int]] = {}
+        for message in messages:
+            f, p = PhpBB._extract_mp_number_id(message)
+            by_folder.setdefault(f, []).append(p)
+
+        deleted = 0
+        for f, ids in by_folder.items():
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start : start + chunk_size]
+                if await self._delete_marked(f, chunk):
+                    deleted += len(chunk)
+                    for pm_id in chunk:
+                        self.mailbox.discard(pm_id, f)
+        return deleted
+
+    async def _delete_marked(self, folder: int, ids: list[int]) -> bool:
+        url = urljoin(self.host, UCP_URL)
+        data = {
+            "cur_folder_id": folder,
+            "mark_option": MARK_DELETE,
+            "submit_mark": "Go",
+            "marked_msg_id[]": ids,
+        }
+        resp = await self.browser.post(url, params=dict(PM_VIEW_FOLDER, f=folder), data=data)
+        confirm = Browser.html2root(resp.content).css_first("form#confirm")
+        if confirm is None:
+            logger.error("No delete confirmation for messages %s", ids)
+            return False
+        form = Browser._extract_form(confirm)
+        form["values"]["confirm"] = "Oui"
+        await self.browser.post(urljoin(self.host, form["action"]), data=form["values"])
+        logger.info("%d messages deleted from folder %d", len(ids), folder)
+        return True
+
+    @operation()
     async def get_birthdays(self):
         """Fetch today's birthdays.
 
@@ -349,6 +824,7 @@ class PhpBB:
         age is set to '0' if not found.
         """
         root = await self.browser.get_html(self.host)
+        self._learn_uids(root)
         raw = root.css_first("div.inner ul.topiclist.forums li.row div.birthday-list p strong")
         if not raw:
             return []
@@ -362,74 +838,117 @@ class PhpBB:
             for b in bdays
         ]
 
-    async def get_member_rank(self, member_name: str) -> str:
-        """Fetch the forum rank for given member_name."""
+    @operation()
+    async def get_member(self, member_name: str) -> Member | None:
+        """Fetch the profile of given member_name (``None`` if unknown).
+
+        Concurrent calls for the same member share a single request.
+        """
+        key = member_name.casefold()
+        task = self._member_requests.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_member(member_name))
+            self._member_requests[key] = task
+            task.add_done_callback(lambda _: self._member_requests.pop(key, None))
+        # shield : annuler un appelant n'annule pas la requête des autres
+        return await asyncio.shield(task)
+
+    async def _fetch_member(self, member_name: str) -> Member | None:
         url = urljoin(self.host, MEMBERS_URL)
         params = dict(VIEW_PROFILE_MODE, un=member_name)
-
         root = await self.browser.get_html(url, params=params)
+        member = parse_member_profile(root, member_name)
+        if member is not None:
+            self.uid_cache.put(member_name, member.uid)
+            self.uid_cache.put(member.name, member.uid)
+        return member
+
+    @operation()
+    async def get_members(
+        self, member_names: list[str], concurrency: int = MEMBERS_CONCURRENCY
+    ) -> dict[str, Member | Exception | None]:
+        """Fetch the profiles of many members, ``concurrency`` at a time.
+
+        Names are deduplicated (case-insensitive). Return
+        ``{member_name: profile}``, the profile being ``None`` for unknown
+        members, or the exception raised while fetching it.
+        """
+        unique: dict[str, str] = {}
+        for name in member_names:
+            unique.setdefault(name.casefold(), name)
+        names = list(unique.values())
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(name: str) -> Member | None:
+            async with semaphore:
+                return await self.get_member(name)
+
+        results = await asyncio.gather(*(fetch(name) for name in names), return_exceptions=True)
+        return dict(zip(names, _gathered(results), strict=True))
+
+    @operation()
+    async def iter_members(
+        self,
+        sort: str = "joined",
+        descending: bool = False,
+        first_char: str | None = None,
+        filters: dict | None = None,
+        prefetch: int = PREFETCH_PAGES,
+    ) -> AsyncGenerator[MemberRow, None]:
+        """Iterate over the members listed by every page of the memberlist.
+
+        One request per page (25 members by default on phpBB), instead of one
+        per profile. The next ``prefetch`` pages download while a page is
+        parsed.
 
-        # Sélecteur CSS équivalent à soup.find("dd")
-        dd = root.css_first("dd")
-        if not dd:
-            return ""
+        Args:
+            sort: ``name``, ``joined``, ``posts``, ``last_visit``, ``rank``,
+                or a raw phpBB ``sk`` key.
+            descending: sort order.
+            first_char: only members whose name starts with this letter
+                (``other`` for names not starting with a letter).
+            filters: extra memberlist parameters, e.g. a member search
+                ``{"mode": "searchuser", "username": "foo*"}``.
+        """
+        params = {"sk": MEMBER_SORT_KEYS.get(sort, sort), "sd": "d" if descending else "a"}
+        if first_char:
+            params["first_char"] = first_char.casefold()
+        params.update(filters or {})
+        url = urljoin(self.host, MEMBERS_URL)
+        async with aclosing(self._iter_pages(url, params, prefetch)) as pages:
+            async for root in pages:
+                for member in parse_memberlist(root):
+                    yield member
 
-        return dd.text().strip()
+    @operation()
+    async def get_member_rank(self, member_name: str) -> str:
+        """Fetch the forum rank for given member_name."""
+        member = await self.get_member(member_name)
+        return member.rank if member else ""
 
+    @operation()
     async def get_member_uid(self, member_name: str) -> int:
         """Fetch the user id number for given member_name."""
+        if (uid := self.uid_cache.get(member_name)) is not None:
+            return uid
         try:
-            url = urljoin(self.host, MEMBERS_URL)
-            params = dict(VIEW_PROFILE_MODE, un=member_name)
-            root = await self.browser.get_html(url, params=params)
-
-            # <link rel="canonical" href="...">
-            link = root.css_first("link[rel=canonical]")
-            if not link:
-                return 0
-
-            href = link.attributes.get("href")
-            if not href:
-                return 0
-
-            match = USER_ID_PATTERN.search(href)
-            if not match:
-                return 0
-
-            return int(match.group("UID"))
-
+            member = await self.get_member(member_name)
         except Exception as e:
-            print(e)
+            logger.error(e)
             return 0
+        return member.uid if member else 0
 
+    @operation()
     async def get_member_infos(self, member_name: str) -> tuple[int, str]:
         """Fetch the user id number AND rank for given member_name."""
-        uid = 0
-        rank = ""
-
         try:
-            url = urljoin(self.host, MEMBERS_URL)
-            params = dict(VIEW_PROFILE_MODE, un=member_name)
-            root = await self.browser.get_html(url, params=params)
-
-            # 1) canonical URL
-            link = root.css_first("link[rel=canonical]")
-            if link and "href" in link.attributes:
-                canonical_url: str = link.attributes["href"] or ""
-                match = USER_ID_PATTERN.search(canonical_url)
-                if match:
-                    uid = int(match.group("UID"))
-
-            # 2) rank = premier <dd>
-            dd = root.css_first("dd")
-            if dd:
-                rank = dd.text().strip()
-
+            member = await self.get_member(member_name)
         except Exception as e:
             logger.error(e)
+            return 0, ""
+        return (member.uid, member.rank) if member else (0, "")
 
-        return uid, rank
-
+    @operation()
     async def fetch_forums(self, url: str = "/index.php") -> list[SubForum]:
         html = await self.browser.get_html(url)
         return parse_sub_forums(html)
@@ -0,0 +1,141 @@
+# pyphpbb_sl/pool.py
+"""Several logged-in accounts on one board, sharing one connection pool."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import Any
+
+import httpx
+
+from .browser import Browser
+from .phpbb import PhpBB
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Keep N ``PhpBB`` sessions logged in on the same board.
+
+    Every session has its own cookie jar, all of them share one transport
+    (hence one pool of warm connections). Sessions are logged in
+    concurrently, and checked out by account name.
+
+    Args:
+        host: url of the phpBB forum.
+        accounts: ``{username: password}``, more can be added with :meth:`add`.
+        transport: transport to share, built from ``limits``/``http2`` if None.
+            A transport given by the caller is not closed by the pool.
+        **browser_options: forwarded to every :class:`Browser`.
+
+    Example::
+
+        async with SessionPool(host, {"Foo": "pass", "Bar": "word"}) as pool:
+            async with pool.checkout("Foo") as phpbb:
+                await phpbb.fetch_unread_messages()
+    """
+
+    def __init__(
+        self,
+        host: str,
+        accounts: dict[str, str] | None = None,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+        **browser_options: Any,
+    ) -> None:
+        self.host = host
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = Browser.make_transport(
+                limits=browser_options.pop("limits", None),
+                keepalive_expiry=browser_options.pop("keepalive_expiry", None),
+                http2=browser_options.pop("http2", False),
+            )
+        self.transport = transport
+        self._browser_options = browser_options
+        self._accounts: dict[str, str] = {}
+        self._sessions: dict[str, PhpBB] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        for username, password in (accounts or {}).items():
+            self.add(username, password)
+
+    async def __aenter__(self) -> SessionPool:
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        type_: type[BaseException] | None,
+        value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._accounts
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    @property
+    def usernames(self) -> list[str]:
+        return list(self._accounts)
+
+    def add(self, username: str, password: str) -> None:
+        """Register an account, it is logged in on next :meth:`open` or checkout."""
+        self._accounts[username] = password
+        self._locks.setdefault(username, asyncio.Lock())
+
+    async def open(self) -> None:
+        """Log in every registered account, concurrently."""
+        await asyncio.gather(*(self._login(name) for name in self._accounts))
+
+    async def _login(self, username: str) -> PhpBB:
+        session = self._sessions.get(username)
+        if session is None:
+            session = PhpBB(self.host, transport=self.transport, **self._browser_options)
+            self._sessions[username] = session
+        if not session.is_logged():
+            if not await session.login(username, self._accounts[username]):
+                logger.error("Pool : login failed for %s", username)
+        return session
+
+    def get(self, username: str) -> PhpBB:
+        """Return the session of ``username``, without locking it."""
+        try:
+            return self._sessions[username]
+        except KeyError:
+            raise KeyError(f"No open session for {username}") from None
+
+    @asynccontextmanager
+    async def checkout(self, username: str) -> AsyncIterator[PhpBB]:
+        """Lock the session of ``username`` for exclusive use (logs in if needed)."""
+        if username not in self._accounts:
+            raise KeyError(f"Unknown account {username}")
+        async with self._locks[username]:
+            yield await self._login(username)
+
+    async def each(self, func: Callable[[str, PhpBB], Awaitable[Any]]) -> dict[str, Any]:
+        """Run ``func(username, phpbb)`` on every account concurrently.
+
+        Return ``{username: result}``.
+        """
+
+        async def run(username: str) -> Any:
+            async with self.checkout(username) as phpbb:
+                return await func(username, phpbb)
+
+        results = await asyncio.gather(*(run(name) for name in self._accounts))
+        return dict(zip(self._accounts, results, strict=True))
+
+    async def close(self) -> None:
+        """Log out every session, close them and the owned transport."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(session.__aexit__(None, None, None) for session in sessions))
+        if self._owns_transport:
+            await self.transport.aclose()
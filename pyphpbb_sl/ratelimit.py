@@ -0,0 +1,103 @@
+# pyphpbb_sl/ratelimit.py
+"""Token-bucket rate limiting of requests sent to a phpBB board."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_READ_RATE = 10.0
+DEFAULT_READ_BURST = 10
+DEFAULT_WRITE_RATE = 1.0
+DEFAULT_WRITE_BURST = 3
+
+
+class TokenBucket:
+    """Classic token bucket.
+
+    Tokens are refilled at ``rate`` per second, up to ``capacity``.
+    ``acquire`` only sleeps when the bucket is empty.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` from the bucket, waiting if needed.
+
+        Return the number of seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:  # waiters are served in FIFO order
+            self._refill()
+            if self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited = delay
+                self._refill()
+            self._tokens -= tokens
+        return waited
+
+
+class RateLimiter:
+    """Per-host rate limiter, with separate budgets for reads and writes.
+
+    Reads are GET requests, writes are everything else (POST).
+    A rate of ``None`` disables the corresponding budget.
+    The same limiter can be shared by many browsers, they then share budgets.
+
+    Args:
+        read_rate: GET requests per second, per host.
+        read_burst: GET requests allowed at once before waiting.
+        write_rate: POST requests per second, per host.
+        write_burst: POST requests allowed at once before waiting.
+    """
+
+    def __init__(
+        self,
+        read_rate: float | None = DEFAULT_READ_RATE,
+        read_burst: int = DEFAULT_READ_BURST,
+        write_rate: float | None = DEFAULT_WRITE_RATE,
+        write_burst: int = DEFAULT_WRITE_BURST,
+    ) -> None:
+        self.read_rate = read_rate
+        self.read_burst = read_burst
+        self.write_rate = write_rate
+        self.write_burst = write_burst
+        self._buckets: dict[tuple[str, bool], TokenBucket] = {}
+
+    @classmethod
+    def unlimited(cls) -> RateLimiter:
+        """Rate limiter that never waits."""
+        return cls(read_rate=None, write_rate=None)
+
+    def bucket(self, host: str, write: bool = False) -> TokenBucket | None:
+        """Return the bucket of ``host`` for reads or writes (None if unlimited)."""
+        rate, burst = (
+            (self.write_rate, self.write_burst) if write else (self.read_rate, self.read_burst)
+        )
+        if rate is None:
+            return None
+        key = (host, write)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(rate, burst)
+        return self._buckets[key]
+
+    async def acquire(self, url: str, write: bool = False) -> float:
+        """Wait for the budget of the host of ``url``. Return seconds waited."""
+        bucket = self.bucket(urlsplit(url).netloc, write)
+        if bucket is None:
+            return 0.0
+        return await bucket.acquire()
@@ -0,0 +1,160 @@
+# pyphpbb_sl/replay.py
+"""Record real exchanges with a board, and replay them offline.
+
+Both classes are httpx transports, to pass as ``transport=`` to
+:class:`pyphpbb_sl.PhpBB` or :class:`pyphpbb_sl.browser.Browser`::
+
+    async with RecordingTransport("fixtures/inbox.json") as recorder:
+        async with PhpBB(host, transport=recorder) as phpbb:
+            await phpbb.login(username, password)
+            await phpbb.fetch_unread_messages()
+
+    replay = ReplayTransport("fixtures/inbox.json", latency=0.05)
+    async with PhpBB(host, transport=replay) as phpbb:
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import random
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+import httpx
+
+from .store import write_private_text
+
+ARCHIVE_VERSION = 1
+# query parameters that change from one session to another
+VOLATILE_PARAMS = frozenset({"sid"})
+# cookies that are credentials: session id and autologin key
+SECRET_COOKIE_SUFFIXES = ("_sid", "_k")
+REDACTED = "redacted"
+SECRET_MIN_LENGTH = 8  # phpBB ids are 16 or 32 hex digits: never redact short strings
+# headers describing the body on the wire, the archive stores it decoded
+WIRE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class ReplayMissError(LookupError):
+    """Raised when replaying a request that was never recorded."""
+
+
+def exchange_key(method: str, url: httpx.URL) -> str:
+    """Key matching a request with recorded exchanges (session ids ignored)."""
+    params = sorted((k, v) for k, v in url.params.multi_items() if k not in VOLATILE_PARAMS)
+    return f"{method} {url.host}{url.path}?{urlencode(params)}"
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to a real transport and record every exchange.
+
+    Request bodies are not recorded (they hold passwords), responses are
+    stored with their headers and decoded body. Session ids and autologin
+    keys are redacted, in cookies, urls and bodies: a replay does not need
+    them. The archive is written, readable by its owner only, by
+    :meth:`save`, or when the transport is closed.
+    """
+
+    def __init__(self, path: str | Path, transport: httpx.AsyncBaseTransport | None = None):
+        self.path = Path(path)
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self.exchanges: list[dict[str, Any]] = []
+        self._secrets: set[str] = set()
+
+    def _redact_cookie(self, header: str) -> str:
+        name, _, rest = header.partition("=")
+        value, _, attributes = rest.partition(";")
+        if not name.strip().endswith(SECRET_COOKIE_SUFFIXES) or len(value) < SECRET_MIN_LENGTH:
+            return header
+        self._secrets.add(value)
+        return f"{name}={REDACTED};{attributes}" if attributes else f"{name}={REDACTED}"
+
+    def _redact(self, text: str) -> str:
+        for secret in self._secrets:
+            text = text.replace(secret, REDACTED)
+        return text
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k not in WIRE_HEADERS]
+
+        self._secrets.update(
+            v
+            for k, v in request.url.params.multi_items()
+            if k == "sid" and len(v) >= SECRET_MIN_LENGTH
+        )
+        recorded = [(k, self._redact_cookie(v) if k == "set-cookie" else v) for k, v in headers]
+        body = content
+        for secret in self._secrets:
+            body = body.replace(secret.encode(), REDACTED.encode())
+        self.exchanges.append(
+            {
+                "key": exchange_key(request.method, request.url),
+                "method": request.method,
+                "url": self._redact(str(request.url)),
+                "status": response.status_code,
+                "headers": recorded,
+                "body": base64.b64encode(body).decode("ascii"),
+            }
+        )
+        return httpx.Response(response.status_code, headers=headers, content=content)
+
+    def save(self) -> None:
+        archive = {"version": ARCHIVE_VERSION, "exchanges": self.exchanges}
+        write_private_text(self.path, json.dumps(archive, indent=1))
+
+    async def aclose(self) -> None:
+        self.save()
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve recorded exchanges, without any network.
+
+    Requests are matched by method, host, path and query (``sid`` ignored).
+    Exchanges recorded several times for the same key are served in order,
+    the last one is then repeated, so a replay can run in a loop.
+
+    Args:
+        path: archive written by :class:`RecordingTransport`.
+        latency: seconds added to every response.
+        jitter: random extra latency, drawn in ``[0, jitter]``.
+    """
+
+    def __init__(self, path: str | Path, latency: float = 0.0, jitter: float = 0.0):
+        archive = json.loads(Path(path).read_text(encoding="utf-8"))
+        self.latency = latency
+        self.jitter = jitter
+        self._exchanges: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for exchange in archive["exchanges"]:
+            self._exchanges[exchange["key"]].append(exchange)
+        self._cursors: dict[str, int] = defaultdict(int)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = exchange_key(request.method, request.url)
+        recorded = self._exchanges.get(key)
+        if not recorded:
+            raise ReplayMissError(f"No recorded exchange for {key}")
+        index = min(self._cursors[key], len(recorded) - 1)
+        self._cursors[key] += 1
+        exchange = recorded[index]
+
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            exchange["status"],
+            headers=exchange["headers"],
+            content=base64.b64decode(exchange["body"]),
+        )
+
+    def rewind(self) -> None:
+        """Serve every recorded exchange from the start again."""
+        self._cursors.clear()
@@ -0,0 +1,107 @@
+# pyphpbb_sl/retry.py
+"""Retry policy and circuit breaker used by :class:`pyphpbb_sl.browser.Browser`."""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+
+import httpx
+
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 8.0
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter.
+
+    Only idempotent requests (GET) are retried, on transport errors and on
+    the given HTTP statuses. ``attempts=1`` disables retries.
+
+    Args:
+        attempts: maximum number of tries of a request.
+        backoff: base delay (seconds), doubled after each failure.
+        max_backoff: upper bound of a delay.
+        jitter: draw each delay uniformly in ``[0, delay]``.
+        statuses: HTTP statuses considered as transient failures.
+    """
+
+    def __init__(
+        self,
+        attempts: int = DEFAULT_ATTEMPTS,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        jitter: bool = True,
+        statuses: tuple[int, ...] = DEFAULT_RETRY_STATUSES,
+    ) -> None:
+        self.attempts = max(attempts, 1)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = statuses
+
+    def is_transient(self, response: httpx.Response) -> bool:
+        return response.status_code in self.statuses
+
+    def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Delay before the try following the failed ``attempt`` (1-based)."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+@dataclass(slots=True)
+class _CircuitState:
+    failures: int = 0
+    opened_at: float | None = None
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests to the host fail fast. After ``reset_timeout`` seconds one
+    trial request is let through: a success closes the circuit, a failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._states: dict[str, _CircuitState] = {}
+
+    def is_open(self, host: str) -> bool:
+        state = self._states.get(host)
+        return state is not None and state.opened_at is not None
+
+    def allow(self, host: str) -> bool:
+        """Tell if a request to ``host`` may be sent now."""
+        state = self._states.get(host)
+        if state is None or state.opened_at is None:
+            return True
+        if time.monotonic() - state.opened_at >= self.reset_timeout:
+            # half-open : let one trial request through
+            state.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self, host: str) -> None:
+        self._states.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        state = self._states.setdefault(host, _CircuitState())
+        state.failures += 1
+        if state.failures >= self.failure_threshold:
+            state.opened_at = time.monotonic()
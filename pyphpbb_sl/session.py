@@ -0,0 +1,49 @@
+# pyphpbb_sl/session.py
+"""phpBB session state, tracked from the cookies set by the board."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# phpbb3_abcde_u, phpbb3_abcde_k, phpbb3_abcde_sid
+COOKIE_PATTERN = re.compile(r"(?P<prefix>phpbb\d?_.*)_(?P<kind>u|k|sid)$")
+ANONYMOUS = 1
+
+
+@dataclass(slots=True)
+class SessionState:
+    """User id, session id and autologin key of a phpBB session.
+
+    Updated incrementally with the cookies of each response, so reading it
+    costs nothing, whatever the size of the cookie jar.
+    """
+
+    user_id: int | None = None
+    sid: str | None = None
+    key: str | None = None
+    cookie_prefix: str | None = None
+
+    @property
+    def logged_in(self) -> bool:
+        return self.user_id not in (None, ANONYMOUS)
+
+    def update(self, cookies: Iterable[tuple[str, object]]) -> None:
+        """Update state with ``(name, value)`` cookie pairs."""
+        for name, value in cookies:
+            match = COOKIE_PATTERN.search(name)
+            if not match:
+                continue
+            self.cookie_prefix = match["prefix"]
+            value = str(value) if value is not None else ""
+            kind = match["kind"]
+            if kind == "u":
+                self.user_id = int(value) if value.isdigit() else None
+            elif kind == "sid":
+                self.sid = value or None
+            else:
+                self.key = value or None
+
+    def reset(self) -> None:
+        self.user_id = self.sid = self.key = self.cookie_prefix = None
@@ -0,0 +1,129 @@
+# pyphpbb_sl/store.py
+"""Persist phpBB session cookies between runs, to skip logging in again."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+PRIVATE_MODE = 0o600  # cookies are credentials
+
+Sessions = dict[str, list[dict[str, Any]]]
+
+
+def create_private(path: Path) -> None:
+    """Create ``path`` if missing, readable by its owner only."""
+    os.close(os.open(path, os.O_WRONLY | os.O_CREAT, PRIVATE_MODE))
+    path.chmod(PRIVATE_MODE)  # also for a file created by an older version
+
+
+def write_private_text(path: Path, text: str) -> None:
+    """Atomically replace ``path`` by ``text``, never readable by others."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.unlink(missing_ok=True)  # O_CREAT keeps the mode of an existing file
+    with os.fdopen(
+        os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, PRIVATE_MODE), "w", encoding="utf-8"
+    ) as f:
+        f.write(text)
+    tmp.replace(path)
+
+
+class SessionStore(ABC):
+    """Base class of session stores.
+
+    A store maps a key (board url and username) to the list of cookies of
+    the session, each cookie being a dict as built by
+    :meth:`pyphpbb_sl.browser.Browser.export_cookies`.
+    """
+
+    @abstractmethod
+    def load(self, key: str) -> list[dict[str, Any]] | None:
+        """Return the cookies saved for ``key``, or ``None``."""
+
+    @abstractmethod
+    def save(self, key: str, cookies: list[dict[str, Any]]) -> None:
+        """Save (or replace) the cookies of ``key``."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Forget ``key`` (no error if unknown)."""
+
+
+class FileSessionStore(SessionStore):
+    """Store sessions in a JSON file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def _read(self) -> Sessions:
+        try:
+            data: Sessions = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return data
+
+    def _write(self, data: Sessions) -> None:
+        write_private_text(self.path, json.dumps(data, indent=2))
+
+    def load(self, key: str) -> list[dict[str, Any]] | None:
+        return self._read().get(key)
+
+    def save(self, key: str, cookies: list[dict[str, Any]]) -> None:
+        data = self._read()
+        data[key] = cookies
+        self._write(data)
+
+    def delete(self, key: str) -> None:
+        data = self._read()
+        if data.pop(key, None) is not None:
+            self._write(data)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store sessions in a SQLite database, readable by its owner only."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        create_private(self.path)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(key TEXT PRIMARY KEY, cookies TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path)
+        try:
+            with db:  # commit, or rollback on error
+                yield db
+        finally:
+            db.close()
+
+    def load(self, key: str) -> list[dict[str, Any]] | None:
+        with self._connect() as db:
+            row = db.execute("SELECT cookies FROM sessions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        cookies: list[dict[str, Any]] = json.loads(row[0])
+        return cookies
+
+    def save(self, key: str, cookies: list[dict[str, Any]]) -> None:
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (key, cookies, updated) VALUES (?, ?, ?)",
+                (key, json.dumps(cookies), time.time()),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as db:
+            db.execute("DELETE FROM sessions WHERE key = ?", (key,))
@@ -0,0 +1,101 @@
+# pyphpbb_sl/uids.py
+"""Cache of member user ids (UID), by username."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_TTL = 7 * 24 * 3600.0
+
+
+class UIDCache:
+    """Size-bounded LRU cache of ``username -> UID``, with a TTL.
+
+    phpBB usernames are case-insensitive, so are the keys. UIDs never change,
+    but a user can be renamed, or deleted and its name reused: entries
+    expire after ``ttl`` seconds. With a ``path``, entries are loaded from,
+    and saved by :meth:`save` to, a JSON file.
+
+    Args:
+        maxsize: maximum number of usernames.
+        ttl: time to live (seconds) of an entry.
+        path: optional JSON file.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl: float = DEFAULT_TTL,
+        path: str | Path | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = Path(path) if path is not None else None
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()  # (uid, expires)
+        if self.path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.get(name) is not None
+
+    def get(self, name: str) -> int | None:
+        """Return the UID of ``name``, if known and not expired."""
+        key = name.casefold()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, name: str, uid: int) -> None:
+        key = name.casefold()
+        self._entries[key] = (uid, time.time() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def update(self, uids: dict[str, int]) -> None:
+        for name, uid in uids.items():
+            self.put(name, uid)
+
+    def discard(self, name: str) -> None:
+        self._entries.pop(name.casefold(), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # -----------------------------
+    # PERSISTENCE
+    # -----------------------------
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        now = time.time()
+        entries = sorted(data.items(), key=lambda item: item[1][1])  # oldest first
+        for key, (uid, expires) in entries[-self.maxsize :]:
+            if expires > now:
+                self._entries[key] = (uid, expires)
+
+    def save(self) -> None:
+        """Write the entries to ``path`` (nothing without a path)."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(dict(self._entries)), encoding="utf-8")
+        tmp.replace(self.path)
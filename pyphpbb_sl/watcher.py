@@ -0,0 +1,134 @@
+# pyphpbb_sl/watcher.py
+"""Watch the inbox of a logged-in session, and dispatch new unread messages.
+
+::
+
+    async with PhpBB(host) as phpbb:
+        await phpbb.login(username, password)
+        watcher = UnreadWatcher(phpbb, min_interval=5, max_interval=60)
+        watcher.on_message(handle)  # async def handle(message): ...
+        await watcher.run(timeout=300)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from .browser import BrowserError
+from .cache import HTTPCache
+from .models import Message
+from .phpbb import INBOX, PhpBB
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[Message], Awaitable[None]]
+
+
+class UnreadWatcher:
+    """Poll the unread messages of one ``PhpBB`` session.
+
+    The session stays open, and each poll is a :meth:`PhpBB.fetch_since`
+    the last message seen by the watcher: the first page of the inbox only,
+    while no message arrives. The watcher keeps its own cursor, so the
+    ``sync_box`` state of the session is neither used nor changed. The interval
+    starts at ``min_interval``, is multiplied by ``backoff`` after each idle
+    poll (or error) up to ``max_interval``, and drops back to
+    ``min_interval`` as soon as a message arrives.
+
+    Unread messages already in the inbox are dispatched by the first poll.
+
+    Args:
+        phpbb: logged-in session.
+        min_interval: seconds between polls while messages arrive.
+        max_interval: upper bound of the interval when idle.
+        backoff: factor applied to the interval after an idle poll.
+        queue: optional queue receiving every new message.
+        cache: optional cache used by the polls only, instead of the browser
+            cache. phpBB sends no validators for
+            ``ucp.php``: it only helps behind a proxy adding ``ETag`` or
+            ``Last-Modified``, or with a TTL rule for the inbox.
+    """
+
+    def __init__(
+        self,
+        phpbb: PhpBB,
+        *,
+        min_interval: float = 5.0,
+        max_interval: float = 120.0,
+        backoff: float = 1.5,
+        queue: asyncio.Queue[Message] | None = None,
+        cache: HTTPCache | None = None,
+    ) -> None:
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("expected 0 < min_interval <= max_interval")
+        self.phpbb = phpbb
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.queue = queue
+        self.interval = min_interval
+        self._callbacks: list[Callback] = []
+        self._stopped = asyncio.Event()
+        self.cache = cache
+        self.last_seen_id = 0
+
+    def on_message(self, callback: Callback) -> Callback:
+        """Register an async callback called with every new message.
+
+        Return the callback, so it can be used as a decorator.
+        """
+        self._callbacks.append(callback)
+        return callback
+
+    async def poll(self) -> list[Message]:
+        """Check the inbox once, dispatch and return the new unread messages."""
+        messages = [m for m in await self._sync() if m.unread]
+        messages.reverse()  # oldest first
+        for message in messages:
+            if self.queue is not None:
+                await self.queue.put(message)
+            results = await asyncio.gather(
+                *(callback(message) for callback in self._callbacks), return_exceptions=True
+            )
+            for error in results:
+                if isinstance(error, Exception):
+                    logger.error("Callback failed for message %s", message.id, exc_info=error)
+        return messages
+
+    async def _sync(self) -> list[Message]:
+        messages = await self.phpbb.fetch_since(self.last_seen_id, INBOX, cache=self.cache)
+        if messages:
+            self.last_seen_id = max(self.last_seen_id, *(m.id for m in messages))
+        return messages
+
+    async def run(self, timeout: float | None = None) -> None:
+        """Poll until :meth:`stop` is called, or for ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            try:
+                active = bool(await self.poll())
+            except BrowserError as e:
+                logger.warning("Polling failed: %s", e)
+                active = False
+            if active:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    break
+            try:
+                await asyncio.wait_for(self._stopped.wait(), delay)
+            except TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        """Make :meth:`run` return after the current poll."""
+        self._stopped.set()
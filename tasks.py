@@ -118,6 +118,16 @@ def test(c):
     c.run("pytest tests/")
 
 
+@task
+def bench(c, ops=100, concurrency="1,4,16", latency=0.0):
+    """Benchmark PhpBB operations against the local fake board."""
+    c.run(
+        f"python -m benchmarks.bench_phpbb --ops {ops} "
+        f"--concurrency {concurrency} --latency {latency}",
+        pty=True,
+    )
+
+
 @task
 def coverage(c):
     """
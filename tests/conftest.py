@@ -0,0 +1,46 @@
+"""Fixtures shared by the tests run against the local `FakeBoard`."""
+
+import time
+
+import httpx
+import pytest
+
+from pyphpbb_sl import PhpBB
+from pyphpbb_sl.fakeboard import FakeBoard
+from pyphpbb_sl.ratelimit import RateLimiter
+
+HOST = "http://board.test"
+
+
+@pytest.fixture
+def board():
+    board = FakeBoard()
+    board.add_user("Foo", "pass", rank="Modérateur", posts=12, birthday_age=27)
+    board.add_user("Bar", "word")
+    return board
+
+
+@pytest.fixture
+def connect():
+    """Factory of `PhpBB` sessions on a board, without throttling."""
+
+    def connect(board, **kwargs):
+        return PhpBB(
+            HOST,
+            transport=httpx.ASGITransport(app=board),
+            rate_limiter=RateLimiter.unlimited(),
+            min_form_age=0,
+            **kwargs,
+        )
+
+    return connect
+
+
+@pytest.fixture
+def paris_tz(monkeypatch):
+    """Run with a local timezone having DST, away from UTC."""
+    monkeypatch.setenv("TZ", "Europe/Paris")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
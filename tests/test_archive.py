@@ -0,0 +1,105 @@
+"""Tests of the SQLite `MessageArchive`, synced from the local `FakeBoard`."""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from pyphpbb_sl.archive import MessageArchive
+from pyphpbb_sl.fakeboard import FakeBoard
+from pyphpbb_sl.models import Message
+
+
+def message(pm_id, subject, content=None, sender="Foo"):
+    url = f"./ucp.php?i=pm&mode=view&f=0&p={pm_id}"
+    return Message(pm_id, subject, url, sender, None, content, True)
+
+
+def test_search(tmp_path):
+    archive = MessageArchive(tmp_path / "pm.sqlite")
+    archive.add([message(1, "Hello", "the token is abc"), message(2, "Token", None, "Bar")])
+    archive.add([message(1, "Hello", None)])  # body kept
+    assert len(archive) == 2
+    assert archive.get(1).content == "the token is abc"
+
+    assert [m.id for m in archive.search("token")] == [2, 1]
+    assert [m.id for m in archive.search("token abc")] == [1]
+    assert [m.id for m in archive.search('token* "', sender="bar")] == [2]
+    assert archive.search(since=time.time() + 60) == []
+    assert len(archive.search(since=datetime.now() - timedelta(minutes=1))) == 2
+    assert len(archive.search(until=time.time() + 60, limit=1)) == 1
+
+    archive.delete([1])
+    assert archive.search("abc") == []
+
+
+@pytest.mark.asyncio
+async def test_sync(tmp_path, connect):
+    board = FakeBoard()
+    board.add_user("Foo", "pass")
+    board.add_user("Bar", "word")
+    board.send_pm("Bar", ["Foo"], "First", "body one")
+    archive = MessageArchive(tmp_path / "pm.sqlite")
+
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        assert len(await phpbb.sync_box()) == 1  # e.g. a watcher on the same session
+        assert await archive.sync(phpbb) == 1
+        assert archive.get(1).content is None
+        assert len(await phpbb.fetch_unread_messages()) == 1  # left unread
+
+    board.send_pm("Bar", ["Foo"], "Second", "body two")
+    async with connect(board) as phpbb:  # new session, the archive knows what is new
+        await phpbb.login("Foo", "pass")
+        assert await archive.sync(phpbb, read_bodies=True) == 1  # and body one, backfilled
+
+    assert [m.subject for m in archive.search("body", sender="Bar")] == ["Second", "First"]
+    assert archive.search("body")[0].sent_at is not None
+
+
+@pytest.mark.asyncio
+async def test_sync_retries_bodies(tmp_path, connect, monkeypatch):
+    board = FakeBoard()
+    board.add_user("Foo", "pass")
+    board.send_pm("Foo", ["Foo"], "Note", "to self")
+    archive = MessageArchive(tmp_path / "pm.sqlite")
+
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        read_many = phpbb.read_many
+
+        async def failing(messages):
+            return [ValueError("boom") for _ in messages]
+
+        monkeypatch.setattr(phpbb, "read_many", failing)
+        assert await archive.sync(phpbb, read_bodies=True) == 2  # inbox and sentbox
+        assert archive.search(folder="inbox")[0].content is None
+
+        monkeypatch.setattr(phpbb, "read_many", read_many)
+        assert await archive.sync(phpbb, read_bodies=True) == 0
+
+    assert [m.folder_id for m in archive.search("self")] == [0, -1]
+    sent = archive.search(folder="sentbox")
+    assert archive.get(1, "sentbox") == sent[0] and sent[0].folder_id == -1
+    archive.delete([1], "inbox")
+    assert archive.get(1) == sent[0] and len(archive) == 1
+
+
+def test_receivers(tmp_path):
+    archive = MessageArchive(tmp_path / "pm.sqlite")
+    sent = message(1, "News")
+    sent.receivers, sent.receiver, sent.folder_id = ("Bar", "Baz"), "Bar", -1
+    archive.add([sent], folder="sentbox")
+    assert archive.get(1) == sent
+    assert [m.id for m in archive.search(receiver="baz")] == [1]
+    assert archive.search(receiver="ba") == []
+
+
+def test_sent_at_round_trip(tmp_path, paris_tz):
+    archive = MessageArchive(tmp_path / "pm.sqlite")
+    sent = message(1, "Spring")
+    sent.sent_at = datetime(2024, 3, 31, 2, 30)  # not a Paris local time
+    archive.add([sent])
+    assert archive.get(1) == sent
+    assert archive.search(since=datetime(2024, 3, 31, 2, 30)) == [sent]
+    assert archive.search(until=datetime(2024, 3, 31, 2, 30)) == []
@@ -0,0 +1,349 @@
+"""Tests for `pyphpbb_sl.browser` (no network, httpx.MockTransport)."""
+
+import gzip
+import time
+
+import httpx
+import pytest
+
+from pyphpbb_sl import PhpBB
+from pyphpbb_sl.browser import Browser, BrowserError, CircuitOpenError
+from pyphpbb_sl.cache import CacheEntry, HTTPCache
+from pyphpbb_sl.ratelimit import RateLimiter, TokenBucket
+from pyphpbb_sl.retry import CircuitBreaker, RetryPolicy
+
+
+def echo_cookie_handler(request: httpx.Request) -> httpx.Response:
+    """Set a cookie on /login, echo the received cookies otherwise."""
+    if request.url.path == "/login":
+        return httpx.Response(200, headers={"Set-Cookie": "phpbb3_x_u=42; Path=/"}, text="ok")
+    return httpx.Response(200, text=request.headers.get("Cookie", ""))
+
+
+@pytest.mark.asyncio
+async def test_user_agent():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["User-Agent"])
+        return httpx.Response(200, text="<p>ok</p>")
+
+    browser = Browser(
+        "http://dummy.io", user_agent="pyphpbb", transport=httpx.MockTransport(handler)
+    )
+    await browser.get_html("index.php")
+    await browser.close()
+    assert seen == ["pyphpbb"]
+
+
+@pytest.mark.asyncio
+async def test_shared_transport_keeps_cookies_separate():
+    transport = httpx.MockTransport(echo_cookie_handler)
+    a = PhpBB("http://dummy.io", transport=transport)
+    b = PhpBB("http://dummy.io", transport=transport)
+
+    await a.browser.post("http://dummy.io/login")
+    root_a = await a.browser.get_html("index.php")
+    root_b = await b.browser.get_html("index.php")
+    assert "phpbb3_x_u=42" in root_a.text()
+    assert "phpbb3_x_u" not in root_b.text()
+
+    # closing one browser must not close the shared transport
+    await a.close()
+    root_b = await b.browser.get_html("index.php")
+    assert root_b is not None
+    await b.close()
+
+
+def test_make_transport_limits():
+    transport = Browser.make_transport(keepalive_expiry=30.0)
+    assert transport._pool._keepalive_expiry == 30.0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_only_waits_when_empty():
+    bucket = TokenBucket(rate=50.0, capacity=2)
+    assert await bucket.acquire() == 0.0
+    assert await bucket.acquire() == 0.0
+    waited = await bucket.acquire()
+    assert waited == pytest.approx(1 / 50, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_budgets():
+    limiter = RateLimiter(read_rate=None, write_rate=1.0, write_burst=1)
+    assert limiter.bucket("dummy.io") is None
+    assert limiter.bucket("dummy.io", write=True) is limiter.bucket("dummy.io", write=True)
+    assert limiter.bucket("dummy.io", write=True) is not limiter.bucket("other.io", write=True)
+    assert await limiter.acquire("http://dummy.io/ucp.php") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_post_waits_for_form_age():
+    def handler(request):
+        return httpx.Response(
+            200, text='<form id="f" action="go"><input name="a" value="1"></form>'
+        )
+
+    browser = Browser(
+        "http://dummy.io",
+        transport=httpx.MockTransport(handler),
+        rate_limiter=RateLimiter.unlimited(),
+        min_form_age=0.05,
+    )
+    await browser.get_form("index.php", "f")
+    start = time.monotonic()
+    await browser.post("go")
+    assert time.monotonic() - start >= 0.04
+    # form is old enough now, no more waiting
+    start = time.monotonic()
+    await browser.post("go")
+    assert time.monotonic() - start < 0.04
+    await browser.close()
+
+
+def make_counting_browser(cache, etag=None):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if etag and request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        headers = {"ETag": etag} if etag else {}
+        return httpx.Response(200, headers=headers, text=f"<p>{request.url.path}</p>")
+
+    browser = Browser(
+        "http://dummy.io",
+        transport=httpx.MockTransport(handler),
+        rate_limiter=RateLimiter.unlimited(),
+        cache=cache,
+    )
+    return browser, calls
+
+
+@pytest.mark.asyncio
+async def test_cache_ttl_hit():
+    browser, calls = make_counting_browser(HTTPCache(rules={r"index\.php": 60}))
+    first = await browser.get_html("index.php")
+    second = await browser.get_html("index.php")
+    await browser.get_html("ucp.php")
+    await browser.get_html("ucp.php")
+    assert first is second
+    assert len(calls) == 3  # ucp.php has no TTL and no validator
+    # a POST invalidates the cache
+    await browser.post("ucp.php")
+    await browser.get_html("index.php")
+    assert len(calls) == 5
+    await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_conditional_get():
+    browser, calls = make_counting_browser(HTTPCache(), etag='"v1"')
+    first = await browser.get_html("ucp.php", params={"i": "pm"})
+    second = await browser.get_html("ucp.php", params={"i": "pm"})
+    assert first is second
+    assert calls[1].headers["If-None-Match"] == '"v1"'
+    await browser.close()
+
+
+def test_cache_lru_eviction():
+    cache = HTTPCache(maxsize=2)
+
+    def entry():
+        return CacheEntry(b"", None, None, None, expires=time.monotonic() + 60)
+
+    cache.store("a", entry())
+    cache.store("b", entry())
+    cache.get("a")
+    cache.store("c", entry())
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def make_failing_browser(failures, **kwargs):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= failures:
+            return httpx.Response(503)
+        return httpx.Response(200, text="<p>ok</p>")
+
+    browser = Browser(
+        "http://dummy.io",
+        transport=httpx.MockTransport(handler),
+        rate_limiter=RateLimiter.unlimited(),
+        **kwargs,
+    )
+    return browser, calls
+
+
+@pytest.mark.asyncio
+async def test_retry_get_with_backoff():
+    browser, calls = make_failing_browser(2, retry=RetryPolicy(attempts=3, backoff=0.001))
+    root = await browser.get_html("index.php")
+    assert root.css_first("p").text() == "ok"
+    assert len(calls) == 3
+    await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_no_retry_on_post():
+    browser, calls = make_failing_browser(1, retry=RetryPolicy(attempts=3, backoff=0.001))
+    with pytest.raises(BrowserError):
+        await browser.post("ucp.php")
+    assert len(calls) == 1
+    await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast():
+    browser, calls = make_failing_browser(
+        10,
+        retry=RetryPolicy(attempts=2, backoff=0.001),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    with pytest.raises(BrowserError):
+        await browser.get_html("index.php")
+    with pytest.raises(CircuitOpenError):
+        await browser.get_html("index.php")
+    assert len(calls) == 2
+    await browser.close()
+
+
+def test_retry_delay_bounds():
+    policy = RetryPolicy(backoff=1.0, max_backoff=4.0, jitter=False)
+    assert [policy.delay(n) for n in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 4.0]
+    assert 0 <= RetryPolicy(backoff=1.0).delay(3) <= 4.0
+
+
+@pytest.mark.parametrize(
+    "content_type,body",
+    [
+        ("text/html; charset=UTF-8", "<p>café ✓</p>".encode()),
+        ("text/html; charset=ISO-8859-1", "<p>café</p>".encode("latin-1")),
+        ("text/html", '<meta charset="iso-8859-1"><p>café</p>'.encode("latin-1")),
+    ],
+)
+@pytest.mark.asyncio
+async def test_get_html_from_bytes(content_type, body):
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": content_type}, content=body)
+
+    browser = Browser(
+        "http://dummy.io",
+        transport=httpx.MockTransport(handler),
+        rate_limiter=RateLimiter.unlimited(),
+    )
+    root = await browser.get_html("index.php")
+    assert root.css_first("p").text().startswith("café")
+    assert await browser.get_bytes("index.php") == body
+    await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_session_tracked_from_responses():
+    def handler(request):
+        if request.url.path == "/login":
+            return httpx.Response(302, headers={"Location": "/index.php"}, text="")
+        return httpx.Response(
+            200,
+            headers=[
+                ("Set-Cookie", "phpbb3_abc_u=43533; Path=/"),
+                ("Set-Cookie", "phpbb3_abc_sid=ffac899f2ff73; Path=/"),
+            ],
+            text="<p>ok</p>",
+        )
+
+    browser = Browser("http://dummy.io", transport=httpx.MockTransport(handler))
+    assert not browser.session.logged_in
+    await browser.post("login")
+    assert browser.session.user_id == 43533
+    assert browser.session.sid == "ffac899f2ff73"
+    assert browser.session.cookie_prefix == "phpbb3_abc"
+
+    browser.client.cookies.set("phpbb3_abc_u", "1", domain="dummy.io")
+    browser.sync_session()
+    assert not browser.session.logged_in
+    await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_hooks_events_carry_operation():
+    events = []
+
+    def handler(request):
+        return httpx.Response(200, text='<a class="forumtitle" href="f1">Marvel</a>')
+
+    phpbb = PhpBB(
+        "http://dummy.io",
+        transport=httpx.MockTransport(handler),
+        rate_limiter=RateLimiter.unlimited(),
+        hooks=[events.append],
+    )
+    await phpbb.fetch_forums()
+    await phpbb.browser.get_html("index.php")
+    await phpbb.close()
+
+    kinds = [(e.kind, e.operation) for e in events]
+    assert kinds == [
+        ("request_start", "fetch_forums"),
+        ("request_end", "fetch_forums"),
+        ("parse", "fetch_forums"),
+        ("request_start", None),
+        ("request_end", None),
+        ("parse", None),
+    ]
+    assert events[1].status == 200
+    assert events[1].size > 0
+    assert events[1].elapsed >= 0
+
+
+@pytest.mark.asyncio
+async def test_hooks_retry_event_and_broken_hook():
+    events = []
+
+    def broken_hook(event):
+        raise RuntimeError("oops")
+
+    browser, _ = make_failing_browser(
+        1, retry=RetryPolicy(backoff=0.001), hooks=[broken_hook, events.append]
+    )
+    await browser.get_html("index.php")
+    await browser.close()
+    assert [e.kind for e in events] == [
+        "request_start",
+        "request_end",
+        "retry",
+        "request_start",
+        "request_end",
+        "parse",
+    ]
+    assert events[1].status == 503
+    assert events[2].attempt == 1
+
+
+@pytest.mark.asyncio
+async def test_hooks_sizes_and_urls():
+    body = gzip.compress(b"<p>" + b"x" * 5000 + b"</p>")
+
+    def handler(request):
+        headers = {"Content-Encoding": "gzip"}
+        return httpx.Response(200, headers=headers, stream=httpx.ByteStream(body))
+
+    events = []
+    browser = Browser(
+        "http://dummy.io",
+        transport=httpx.MockTransport(handler),
+        cache=HTTPCache(ttl=60),
+        hooks=[events.append],
+    )
+    await browser.get_html("index.php", params={"f": 1})
+    await browser.get_html("index.php", params={"f": 1}, use_cache=False)
+    await browser.close()
+    ends = [e for e in events if e.kind == "request_end"]
+    assert [e.size for e in ends] == [len(body), len(body)]  # compressed, as transferred
+    parses = [e for e in events if e.kind == "parse"]
+    assert [e.url for e in parses] == ["http://dummy.io/index.php?f=1"] * 2
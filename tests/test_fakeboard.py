@@ -0,0 +1,285 @@
+"""End-to-end tests of `PhpBB` against the local `FakeBoard` (no network)."""
+
+import asyncio
+import dataclasses
+from contextlib import aclosing
+from datetime import datetime
+
+import pytest
+
+from pyphpbb_sl.browser import BrowserError
+from pyphpbb_sl.fakeboard import FakeBoard
+
+
+@pytest.mark.asyncio
+async def test_login_logout(board, connect):
+    async with connect(board) as phpbb:
+        assert not await phpbb.login("Foo", "wrong")
+        assert await phpbb.login("Foo", "pass")
+        assert phpbb._get_user_id() == 2
+        await phpbb.logout()
+        assert phpbb._get_user_id() == 1
+
+
+@pytest.mark.asyncio
+async def test_send_read_delete(board, connect):
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        assert await phpbb.send_private_message("Bar", "Hello", "token 1234")
+
+    async with connect(board) as phpbb:
+        await phpbb.login("Bar", "word")
+        unread = await phpbb.fetch_unread_messages()
+        assert [(m.subject, m.sender) for m in unread] == [("Hello", "Foo")]
+        message = await phpbb.read_private_message(phpbb.find_expected_message_by_user("Foo"))
+        assert message.content == "token 1234"
+        assert await phpbb.fetch_unread_messages() == []
+
+        read = await phpbb.fetch_read_messages()
+        await phpbb.delete_mp(read[0])
+        assert await phpbb.fetch_read_messages() == []
+
+
+@pytest.mark.asyncio
+async def test_expected_message_deleted_elsewhere(board, connect):
+    board.send_pm("Bar", ["Foo"], "Token", "1234")
+    async with connect(board) as phpbb, connect(board) as other:
+        await phpbb.login("Foo", "pass")
+        await other.login("Foo", "pass")
+        await phpbb.send_private_message("Bar", "Hello", "...")
+        await phpbb.fetch_sent_messages()
+        assert phpbb.find_expected_message_by_user("Foo") is None  # sent, not received
+        [unread] = await phpbb.fetch_unread_messages()
+        assert phpbb.find_expected_message_by_user("bar") == unread
+
+        await other.delete_mp(await other.read_private_message(unread))
+        assert await phpbb.fetch_unread_messages() == []
+        assert phpbb.find_expected_message_by_user("Bar") is None
+
+
+@pytest.mark.asyncio
+async def test_flood_limit(board, connect):
+    board.flood_interval = 60
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        assert await phpbb.send_private_message("Bar", "Hello", "first")
+        assert not await phpbb.send_private_message("Bar", "Hello", "too fast")
+    assert len(board.messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_members_and_forums(board, connect):
+    async with connect(board) as phpbb:
+        await phpbb.login("Bar", "word")
+        assert await phpbb.get_member_infos("Foo") == (2, "Modérateur")
+        assert await phpbb.get_member_uid("Foo") == 2
+        assert await phpbb.get_member_rank("Foo") == "Modérateur"
+        assert await phpbb.get_birthdays() == [{"name": "Foo", "age": 27}]
+        forums = await phpbb.fetch_forums()
+        assert "Marvel" in [f.name for f in forums]
+        forums = await phpbb.fetch_forums("viewforum.php?f=3")
+        assert [f.name for f in forums] == ["DC Rebirth"]
+
+
+def test_generate():
+    board = FakeBoard.generate(users=5, messages=3)
+    assert len(board.users) == 5
+    assert len(board.messages) == 15
+    assert all(len(box) == 3 for box in board.inbox.values())
+
+
+@pytest.mark.asyncio
+async def test_delete_many(board, connect):
+    for n in range(7):
+        board.send_pm("Bar", ["Foo"], f"Spam {n}", "...")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        unread = await phpbb.fetch_unread_messages()
+        assert len(unread) == 7
+        before = board.requests
+        assert await phpbb.delete_many(unread, chunk_size=5) == 7
+        assert board.requests - before == 4  # 2 chunks, mark + confirm each
+        assert await phpbb.fetch_unread_messages() == []
+
+
+@pytest.mark.asyncio
+async def test_iter_box_all_pages(connect):
+    board = FakeBoard(per_page=3)
+    board.add_user("Foo", "pass")
+    board.add_user("Bar", "word")
+    for n in range(8):
+        board.send_pm("Bar", ["Foo"], f"Spam {n}", "...")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        await phpbb.read_private_message((await phpbb.fetch_unread_messages())[0])
+        subjects = [m.subject async for m in phpbb.iter_box()]
+        assert subjects == [f"Spam {n}" for n in reversed(range(8))]
+        assert len(await phpbb.fetch_unread_messages()) == 7
+        assert [m.subject for m in await phpbb.fetch_read_messages()] == ["Spam 7"]
+
+        before = board.requests
+        async for _message in phpbb.iter_box(prefetch=1):
+            break  # first page, and one page read ahead
+        assert board.requests - before <= 2
+
+        before = board.requests
+        lazy = [m.subject async for m in phpbb.iter_box(prefetch=0)]
+        assert lazy == subjects and board.requests - before == 3  # each page once
+        before = board.requests
+        async with aclosing(phpbb.iter_box(prefetch=0)) as messages:
+            async for _message in messages:
+                break
+        assert board.requests - before == 1
+
+
+@pytest.mark.asyncio
+async def test_read_many(board, connect):
+    for n in range(5):
+        board.send_pm("Bar", ["Foo"], f"Spam {n}", f"text {n}")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        unread = await phpbb.fetch_unread_messages()
+        broken = dataclasses.replace(unread[0], url="./missing.php")
+        results = await phpbb.read_many([*unread, broken], concurrency=2)
+        assert [r.content for r in results[:-1]] == [f"text {n}" for n in reversed(range(5))]
+        assert isinstance(results[-1], BrowserError)
+
+        streamed = [r async for _m, r in phpbb.iter_read([broken, *unread], concurrency=2)]
+        assert len(streamed) == 6
+        assert sum(isinstance(r, Exception) for r in streamed) == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_box(connect):
+    board = FakeBoard(per_page=3)
+    board.add_user("Foo", "pass")
+    board.add_user("Bar", "word")
+    for n in range(8):
+        board.send_pm("Bar", ["Foo"], f"Spam {n}", "...")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        assert len(await phpbb.sync_box()) == 8
+
+        board.send_pm("Bar", ["Foo"], "New 1", "...")
+        board.send_pm("Bar", ["Foo"], "New 2", "...")
+        before = board.requests
+        assert [m.subject for m in await phpbb.sync_box()] == ["New 2", "New 1"]
+        assert board.requests - before == 1
+        assert await phpbb.sync_box() == []
+
+
+@pytest.mark.asyncio
+async def test_send_private_messages(connect):
+    board = FakeBoard(max_recipients=2)
+    board.add_user("Foo", "pass")
+    for name in ("Bar", "Baz", "Qux"):
+        board.add_user(name, "word")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        before = board.requests
+        outcomes = await phpbb.send_private_messages(
+            ["bar", "Baz", "Nobody", "Qux"], "News", "Hello all", max_recipients=2
+        )
+        assert outcomes == {"bar": True, "Baz": True, "Nobody": False, "Qux": True}
+        assert board.requests - before == 5  # compose form, then 2 POST per pack
+        for name in ("Bar", "Baz", "Qux"):
+            assert len(board.inbox[board.user(name).uid]) == 1
+
+        # pack over the board limit: refused, then split down to single sends
+        before = board.requests
+        names = ["Bar", "Baz", "Qux"]
+        assert await phpbb.send_private_messages(names, "Split", "...", 3) == dict.fromkeys(
+            names, True
+        )
+        for name in names:
+            assert len(board.inbox[board.user(name).uid]) == 2
+        assert board.requests - before == 5  # refused POST, fresh compose form, 1 POST per send
+
+
+@pytest.mark.asyncio
+async def test_listing_details(board, connect):
+    board.add_user("Baz", "word")
+    pm = board.send_pm("Foo", ["Bar", "Baz"], "Files", "...", attachment=True)
+    board.send_pm("Bar", ["Foo"], "Plain", "...")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        [sent] = await phpbb.fetch_sent_messages()
+        assert (sent.sender, sent.receiver, sent.receivers) == ("Foo", "Bar", ("Bar", "Baz"))
+        assert sent.attachment and sent.folder_id == -1
+        assert sent.sent_at == pm.sent_at.replace(tzinfo=None, second=0, microsecond=0)
+
+        [received] = await phpbb.fetch_unread_messages()
+        assert (received.sender, received.receivers, received.folder_id) == ("Bar", (), 0)
+        assert not received.attachment and received.sent_at is not None
+
+
+@pytest.mark.asyncio
+async def test_get_members(board, connect):
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        before = board.requests
+        members = await phpbb.get_members(["Foo", "bar", "foo", "Nobody"], concurrency=2)
+        assert board.requests - before == 3
+        assert list(members) == ["Foo", "bar", "Nobody"]
+        foo = members["Foo"]
+        assert (foo.uid, foo.name, foo.rank, foo.posts) == (2, "Foo", "Modérateur", 12)
+        assert foo.registered == datetime(2020, 1, 1)
+        assert foo.details["Rang"] == "Modérateur"
+        assert members["bar"].name == "Bar" and members["Nobody"] is None
+
+        before = board.requests
+        same = await asyncio.gather(*(phpbb.get_member("Bar") for _ in range(5)))
+        assert board.requests - before == 1  # coalesced
+        assert all(member == same[0] for member in same)
+
+
+@pytest.mark.asyncio
+async def test_get_members_failures(board, connect, monkeypatch):
+    async def get_member(name):
+        if name == "Stop":
+            raise asyncio.CancelledError  # not a failed fetch
+        raise ValueError(name)
+
+    async with connect(board) as phpbb:
+        monkeypatch.setattr(phpbb, "get_member", get_member)
+        members = await phpbb.get_members(["Foo"])
+        assert isinstance(members["Foo"], ValueError)
+        with pytest.raises(asyncio.CancelledError):
+            await phpbb.get_members(["Foo", "Stop"])
+
+
+@pytest.mark.asyncio
+async def test_iter_members(connect):
+    board = FakeBoard.generate(users=60, messages=0, members_per_page=25)
+    async with connect(board) as phpbb:
+        await phpbb.login("user0", "password0")
+        before = board.requests
+        members = [m async for m in phpbb.iter_members()]
+        assert board.requests - before == 3
+        assert sorted(m.uid for m in members) == sorted(board.users)
+        assert all(m.name == board.users[m.uid].name for m in members)
+        assert all(m.joined is not None for m in members)
+
+        by_posts = [m.posts async for m in phpbb.iter_members(sort="posts", descending=True)]
+        assert by_posts == sorted((u.posts for u in board.users.values()), reverse=True)
+
+        names = [m.name async for m in phpbb.iter_members(sort="name", first_char="U")]
+        assert names and all(name.startswith("user") for name in names)
+        assert names == sorted(names, key=str.casefold)
+
+
+@pytest.mark.asyncio
+async def test_crawlers_tag_events(connect):
+    board = FakeBoard.generate(users=60, messages=0)
+    events = []
+    async with connect(board, hooks=[events.append]) as phpbb:
+        await phpbb.login("user0", "password0")
+        events.clear()
+        async for member in phpbb.iter_members():
+            if member.name == "user0":
+                await phpbb.browser.get_html("index.php")  # caller's own request
+        async for _message in phpbb.iter_box():
+            pass
+    starts = [e.operation for e in events if e.kind == "request_start"]
+    assert starts.count("iter_members") == 3  # prefetched pages too
+    assert [op for op in starts if op != "iter_members"] == [None, "iter_box", "logout"]
@@ -0,0 +1,68 @@
+"""Tests of the `Mailbox` indexes."""
+
+import dataclasses
+
+from pyphpbb_sl.models import Mailbox, Message
+
+
+def message(pm_id, subject, sender="Foo", receiver=None, unread=True):
+    url = f"./ucp.php?i=pm&mode=view&f=0&p={pm_id}"
+    return Message(pm_id, subject, url, sender, receiver, None, unread, folder_id=0)
+
+
+def test_lookups():
+    box = Mailbox(
+        [
+            message(1, "Token abc", "Foo"),
+            message(2, "token xyz", "Bar", receiver="Foo"),
+            message(3, "Tokenizer, a very long subject for the prefix index", "foo"),
+        ]
+    )
+    assert len(box) == 3 and 2 in box
+    assert [m.id for m in box.by_sender("FOO")] == [1, 3]
+    assert [m.id for m in box.by_receiver("foo")] == [2]
+    assert [m.id for m in box.by_subject("TOKEN")] == [1, 2, 3]
+    assert [m.id for m in box.by_subject("token ")] == [1, 2]
+    assert [m.id for m in box.by_subject("tokenizer, a very long subject for")] == [3]
+    assert box.by_subject("nothing") == []
+    assert box.get(4) is None
+
+
+def test_replace_and_discard():
+    box = Mailbox([message(1, "Hello", "Foo")])
+    box.add(message(1, "Hello", "Foo", unread=False))
+    assert len(box) == 1 and not box.by_sender("Foo")[0].unread
+
+    box.discard(1)
+    box.discard(1)
+    assert len(box) == 0
+    assert box.by_sender("Foo") == [] and box.by_subject("H") == []
+    assert not box._senders and not box._subjects
+
+
+def test_replace_folder():
+    sent = dataclasses.replace(message(3, "Sent", "Bar"), folder_id=-1)
+    box = Mailbox([sent])
+    box.replace_folder(0, [message(1, "One"), message(2, "Two")])
+    box.replace_folder(0, [message(2, "Two", unread=False)])  # 1 deleted on the board
+    assert [m.id for m in box] == [3, 2]
+    two = box.get(2)
+    assert two is not None and not two.unread
+
+
+def test_message_sent_to_oneself():
+    received = message(4, "Note", "Foo", receiver="Foo")
+    sent = dataclasses.replace(received, folder_id=-1)
+    box = Mailbox()
+    box.replace_folder(0, [received])
+    box.replace_folder(-1, [sent])
+    box.replace_folder(0, [dataclasses.replace(received, unread=False)])
+    assert len(box) == 2 and 4 in box
+    assert [m.folder_id for m in box.by_sender("Foo")] == [-1, 0]
+    read = box.get(4, 0)
+    assert box.get(4, -1) == sent and read is not None and not read.unread
+
+    box.discard(4, 0)
+    assert box.get(4) == sent and [m.id for m in box.by_receiver("Foo")] == [4]
+    box.discard(4)
+    assert 4 not in box and not box._senders and not box._folders
@@ -0,0 +1,67 @@
+"""Tests of the compact `MessageStore`."""
+
+import dataclasses
+from datetime import datetime
+
+import pytest
+
+from pyphpbb_sl.models import Message, MessageStore
+
+
+def message(pm_id, subject="Hello", sender="Foo", receiver=None, folder=0, **fields):
+    url = f"./ucp.php?i=pm&mode=view&f={folder}&p={pm_id}"
+    return Message(pm_id, subject, url, sender, receiver, None, True, folder_id=folder, **fields)
+
+
+def test_headers_round_trip():
+    messages = [
+        message(1),
+        message(
+            2,
+            "Re: Hello",
+            "Bar",
+            receiver="Foo",
+            folder=-1,
+            receivers=("Foo", "Baz"),
+            sent_at=datetime(2024, 1, 2, 15, 4),
+            attachment=True,
+        ),
+        dataclasses.replace(message(3), url="./ucp.php?i=pm&mode=view&f=0&p=3&sid=x"),
+    ]
+    store = MessageStore(messages)
+    assert list(store) == messages
+    assert store[-1] == messages[-1] and store.get(2) == messages[1]
+    assert len(store._names) == 3  # Foo, Bar and Baz stored once
+    assert list(store._urls) == [3]
+
+    store.append(dataclasses.replace(messages[0], unread=False))
+    assert len(store) == 3 and not store[0].unread
+
+
+def test_sent_at_round_trip(paris_tz):
+    # 02:30 does not exist in Paris that day: stored as wall-clock time anyway
+    messages = [message(n, sent_at=datetime(2024, 3, 31, n, 30)) for n in (1, 2, 3)]
+    store = MessageStore(messages)
+    assert list(store) == messages
+
+
+@pytest.mark.asyncio
+async def test_lazy_bounded_bodies():
+    loaded = []
+
+    async def loader(message):
+        loaded.append(message.id)
+        return dataclasses.replace(message, content=f"body {message.id}", unread=False)
+
+    store = MessageStore([message(n) for n in range(1, 4)], loader=loader, max_bodies=2)
+    assert store[0].content is None
+    assert await store.content(1) == "body 1"
+    assert await store.content(1) == "body 1"
+    assert store.get(1) == dataclasses.replace(message(1), content="body 1", unread=False)
+
+    await store.content(2)
+    await store.content(3)  # drops the body of 1
+    await store.content(1)
+    assert loaded == [1, 2, 3, 1]
+    with pytest.raises(KeyError):
+        await store.content(4)
@@ -0,0 +1,61 @@
+"""Tests of the page parsers."""
+
+from datetime import datetime
+
+import pytest
+
+from pyphpbb_sl import PhpBB
+from pyphpbb_sl.browser import Browser
+from pyphpbb_sl.parsers import parse_date, parse_memberlist, parse_pagination
+
+NOW = datetime(2024, 3, 10, 12, 0)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Mon Jan 01, 2024 3:04 pm", datetime(2024, 1, 1, 15, 4)),
+        ("Tue Mar 05, 2024 15:04", datetime(2024, 3, 5, 15, 4)),
+        ("mar. 5 mars 2024 15:04", datetime(2024, 3, 5, 15, 4)),
+        ("sam.\xa017 févr. 2024, 09:12", datetime(2024, 2, 17, 9, 12)),
+        ("Today, 3:04 pm", datetime(2024, 3, 10, 15, 4)),
+        ("Hier, 15:04", datetime(2024, 3, 9, 15, 4)),
+        ("il y a 5 minutes", None),
+    ],
+)
+def test_parse_date(text, expected):
+    assert parse_date(text, now=NOW) == expected
+
+
+def test_parse_pagination():
+    links = "".join(
+        f'<a class="button" href="./ucp.php?i=pm&amp;folder=inbox&amp;start={start}">p</a>'
+        for start in (50, 100, 450)  # 1 2 3 … 10
+    )
+    root = Browser.html2root(f'<div class="pagination">{links}</div>')
+    assert parse_pagination(root) == list(range(50, 500, 50))
+    assert parse_pagination(Browser.html2root("<p>single page</p>")) == []
+
+
+def test_parse_memberlist():
+    root = Browser.html2root(
+        '<table class="table1" id="memberlist"><thead><tr><th class="name">Username</th>'
+        '<th class="joined">Joined</th><th class="posts">Posts</th></tr></thead><tbody>'
+        '<tr><td><span class="rank-img"><img alt="Admin"></span>'
+        '<a href="./memberlist.php?mode=viewprofile&amp;u=2" class="username-coloured">Foo</a>'
+        "</td><td>Mon Jan 01, 2024 3:04 pm</td><td>1,234</td></tr>"
+        '<tr><td colspan="3">No members found.</td></tr></tbody></table>'
+    )
+    [foo] = parse_memberlist(root)
+    assert (foo.uid, foo.name, foo.rank, foo.posts) == (2, "Foo", "Admin", 1234)
+    assert foo.joined == datetime(2024, 1, 1, 15, 4) and foo.last_visit is None
+
+
+def test_parse_sent_at_time_element(paris_tz):
+    row = Browser.html2root(
+        '<dl><dt><time datetime="2024-01-01T10:00:00+00:00">Mon Jan 01, 2024 11:00 am</time>'
+        '</dt></dl><p><time datetime="2024-01-01T10:00:00+00:00">il y a 5 minutes</time></p>'
+    )
+    shown, relative = row.css("time")
+    assert PhpBB._parse_sent_at(shown) == datetime(2024, 1, 1, 11, 0)  # as displayed
+    assert PhpBB._parse_sent_at(relative) == datetime(2024, 1, 1, 11, 0)  # UTC, to local
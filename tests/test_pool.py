@@ -0,0 +1,63 @@
+"""Tests for `pyphpbb_sl.pool` (no network, httpx.MockTransport)."""
+
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from pyphpbb_sl import SessionPool
+from pyphpbb_sl.ratelimit import RateLimiter
+
+UIDS = {"Foo": 2, "Bar": 3}
+
+
+def login_handler(request: httpx.Request) -> httpx.Response:
+    """Mock board : log in anybody listed in UIDS."""
+    mode = request.url.params.get("mode")
+    if request.method == "GET":
+        cookie = request.headers.get("Cookie", "")
+        return httpx.Response(200, text=f'<input name="sid" value="x"><p id="c">{cookie}</p>')
+    if mode == "login":
+        name = parse_qs(request.content.decode())["username"][0]
+        return httpx.Response(
+            200, headers={"Set-Cookie": f"phpbb3_t_u={UIDS[name]}; Path=/"}, text="ok"
+        )
+    return httpx.Response(200, headers={"Set-Cookie": "phpbb3_t_u=1; Path=/"}, text="bye")
+
+
+@pytest.fixture
+def pool():
+    return SessionPool(
+        "http://dummy.io",
+        {"Foo": "pass", "Bar": "word"},
+        transport=httpx.MockTransport(login_handler),
+        rate_limiter=RateLimiter.unlimited(),
+        min_form_age=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_sessions_are_isolated(pool):
+    async with pool:
+        assert pool.get("Foo").is_logged()
+        assert pool.get("Foo")._get_user_id() == 2
+        assert pool.get("Bar")._get_user_id() == 3
+
+        async def whoami(name, phpbb):
+            root = await phpbb.browser.get_html("index.php")
+            return root.css_first("#c").text()
+
+        cookies = await pool.each(whoami)
+        assert cookies == {"Foo": "phpbb3_t_u=2", "Bar": "phpbb3_t_u=3"}
+
+
+@pytest.mark.asyncio
+async def test_pool_checkout(pool):
+    async with pool:
+        async with pool.checkout("Bar") as phpbb:
+            assert phpbb is pool.get("Bar")
+        with pytest.raises(KeyError):
+            async with pool.checkout("Baz"):
+                pass
+    with pytest.raises(KeyError):
+        pool.get("Foo")
@@ -3,11 +3,14 @@
 """Tests for `pyphpbb_sl` package."""
 
 from collections import namedtuple
+from urllib.parse import parse_qs
 
+import httpx
 import pytest
 from selectolax.parser import HTMLParser
 
 from pyphpbb_sl import Message, PhpBB
+from pyphpbb_sl.ratelimit import RateLimiter
 
 
 @pytest.fixture
@@ -46,8 +49,8 @@ async def test_init_close():
 @pytest.mark.asyncio
 async def test_get_user_id(phpbb_dummy, cookies):
     """ "Test get_user_id"""
-    # Mock cookies
-    phpbb_dummy.browser.list_cookies = lambda: cookies
+    # Mock cookies set by the board
+    phpbb_dummy.browser.session.update(cookies)
 
     # Test la méthode interne
     assert phpbb_dummy._get_user_id() == 43533
@@ -57,21 +60,21 @@ async def test_get_user_id(phpbb_dummy, cookies):
 async def test_get_sid(phpbb_dummy, cookies):
     """Test get user SID."""
 
-    phpbb_dummy.browser.list_cookies = lambda: cookies
+    phpbb_dummy.browser.session.update(cookies)
     assert phpbb_dummy._get_sid() == "ffac899f2ff73"
 
 
 @pytest.mark.asyncio
 async def test_is_logged(phpbb_dummy, cookies):
     """Test get user SID."""
-    phpbb_dummy.browser.list_cookies = lambda: cookies
+    phpbb_dummy.browser.session.update(cookies)
     assert phpbb_dummy.is_logged()
 
 
 @pytest.mark.asyncio
 async def test_is_logged_fail(phpbb_dummy, not_logged_cookies):
     """Test fail login."""
-    phpbb_dummy.browser.list_cookies = lambda: not_logged_cookies
+    phpbb_dummy.browser.session.update(not_logged_cookies)
     assert not phpbb_dummy.is_logged()
 
 
@@ -158,3 +161,47 @@ testdata = [
 def test_parse_age(tag, expected):
     age = PhpBB._parse_age(tag)
     assert age == expected
+
+
+COMPOSE_FORM = """
+<form id="postform" action="./ucp.php?i=pm&amp;mode=compose&amp;sid=abc" method="post">
+ <input type="text" name="username_list" value="">
+ <input type="radio" name="icon" value="0">
+ <input type="hidden" name="creation_time" value="1600000000">
+ <input type="hidden" name="form_token" value="f0f0f0">
+ <input type="submit" name="post" value="Envoyer">
+</form>
+"""
+
+
+@pytest.fixture
+def compose_board():
+    """Mock board answering the compose form, counting requests."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.method == "GET":
+            return httpx.Response(200, text=COMPOSE_FORM)
+        data = parse_qs(request.content.decode())
+        if "add_to" in data:
+            return httpx.Response(200, text='<input name="address_list[u][42]" value="to">')
+        assert data["address_list[u][42]"] == ["to"]
+        assert data["form_token"] == ["f0f0f0"]
+        return httpx.Response(200, text="<p>Message sent</p>")
+
+    return httpx.MockTransport(handler), calls
+
+
+@pytest.mark.asyncio
+async def test_send_private_message_reuses_compose_form(compose_board):
+    transport, calls = compose_board
+    phpbb = PhpBB(
+        "http://dummy.io", transport=transport, rate_limiter=RateLimiter.unlimited(), min_form_age=0
+    )
+    assert await phpbb.send_private_message("Foobar", "Hi", "Hello")
+    assert await phpbb.send_private_message("Foobar", "Hi", "Hello again")
+    await phpbb.close()
+    # the second message skips the compose GET, and the add_to POST (UID cached)
+    assert [c.method for c in calls] == ["GET", "POST", "POST", "POST"]
+    assert "add_to" not in parse_qs(calls[-1].content.decode())
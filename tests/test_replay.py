@@ -0,0 +1,58 @@
+"""Tests for `pyphpbb_sl.replay` (no network)."""
+
+import base64
+import time
+
+import httpx
+import pytest
+
+from pyphpbb_sl import PhpBB
+from pyphpbb_sl.ratelimit import RateLimiter
+from pyphpbb_sl.replay import RecordingTransport, ReplayMissError, ReplayTransport
+
+SID, KEY = "0123456789abcdef0123456789abcdef", "fedcba9876543210"
+
+
+def board(request: httpx.Request) -> httpx.Response:
+    if request.method == "POST":
+        cookies = [
+            ("Set-Cookie", "phpbb3_t_u=2; Path=/"),
+            ("Set-Cookie", f"phpbb3_t_sid={SID}; Path=/; HttpOnly"),
+            ("Set-Cookie", f"phpbb3_t_k={KEY}; Path=/"),
+        ]
+        return httpx.Response(200, headers=cookies, text=f'<a href="./ucp.php?sid={SID}">ok</a>')
+    return httpx.Response(200, text='<a class="forumtitle" href="f1">Marvel</a>')
+
+
+def make_phpbb(transport):
+    return PhpBB("http://dummy.io", transport=transport, rate_limiter=RateLimiter.unlimited())
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay(tmp_path):
+    path = tmp_path / "fixture.json"
+    async with RecordingTransport(path, httpx.MockTransport(board)) as recorder:
+        async with make_phpbb(recorder) as phpbb:
+            await phpbb.browser.post("ucp.php", params={"mode": "login", "sid": "a"})
+            forums = await phpbb.fetch_forums()
+    assert [f.name for f in forums] == ["Marvel"]
+    assert path.stat().st_mode & 0o777 == 0o600
+    fixture = path.read_text()
+    assert SID not in fixture and KEY not in fixture
+    assert base64.b64encode(SID.encode()).decode() not in fixture
+    assert "phpbb3_t_sid=redacted; Path=/; HttpOnly" in fixture
+
+    replay = ReplayTransport(path, latency=0.02)
+    async with make_phpbb(replay) as phpbb:
+        # another sid, same exchange
+        await phpbb.browser.post("ucp.php", params={"mode": "login", "sid": "b"})
+        assert phpbb._get_user_id() == 2
+        start = time.monotonic()
+        forums = await phpbb.fetch_forums()
+        assert time.monotonic() - start >= 0.02
+        # exhausted exchanges repeat the last one
+        forums = await phpbb.fetch_forums()
+        assert [f.name for f in forums] == ["Marvel"]
+
+        with pytest.raises(ReplayMissError):
+            await phpbb.browser.get_html("memberlist.php")
@@ -0,0 +1,102 @@
+"""Tests for `pyphpbb_sl.store` and session restore (no network)."""
+
+import httpx
+import pytest
+
+from pyphpbb_sl import PhpBB
+from pyphpbb_sl.ratelimit import RateLimiter
+from pyphpbb_sl.store import FileSessionStore, SQLiteSessionStore
+
+COOKIES = [
+    {
+        "name": "phpbb3_t_u",
+        "value": "2",
+        "domain": "dummy.io",
+        "path": "/",
+        "expires": None,
+        "secure": False,
+    }
+]
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "json":
+        return FileSessionStore(tmp_path / "sessions.json")
+    return SQLiteSessionStore(tmp_path / "sessions.db")
+
+
+def test_store_roundtrip(store):
+    assert store.load("k") is None
+    store.save("k", COOKIES)
+    assert store.load("k") == COOKIES
+    store.delete("k")
+    assert store.load("k") is None
+
+
+def test_store_is_private(store):
+    store.save("k", COOKIES)
+    assert store.path.stat().st_mode & 0o777 == 0o600
+    assert not store.path.with_suffix(store.path.suffix + ".tmp").exists()
+
+
+class Board:
+    """Mock board : a session is valid while its sid is in `valid_sids`."""
+
+    def __init__(self):
+        self.valid_sids = set()
+        self.calls = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append((request.method, request.url.params.get("mode")))
+        mode = request.url.params.get("mode")
+        if request.method == "POST" and mode == "login":
+            self.valid_sids.add("s1")
+            cookies = [("Set-Cookie", "phpbb3_t_u=2; Path=/"), ("Set-Cookie", "phpbb3_t_sid=s1")]
+            return httpx.Response(200, headers=cookies, text="ok")
+        if request.method == "POST" and mode == "logout":
+            self.valid_sids.clear()
+            return httpx.Response(200, headers={"Set-Cookie": "phpbb3_t_u=1"}, text="bye")
+        if "phpbb3_t_sid=s1" in request.headers.get("Cookie", "") and self.valid_sids:
+            return httpx.Response(200, text='<a href="./ucp.php?mode=logout&amp;sid=s1">x</a>')
+        return httpx.Response(200, text='<input name="username"><input name="password">')
+
+
+def make_phpbb(board, store, **kwargs):
+    return PhpBB(
+        "http://dummy.io",
+        session_store=store,
+        transport=httpx.MockTransport(board.handler),
+        rate_limiter=RateLimiter.unlimited(),
+        min_form_age=0,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_login_reuses_stored_session(store):
+    board = Board()
+    async with make_phpbb(board, store, logout_on_exit=False) as phpbb:
+        assert await phpbb.login("Foo", "pass")
+    assert len(board.calls) == 2  # GET login form, POST login
+
+    board.calls.clear()
+    async with make_phpbb(board, store) as phpbb:
+        assert await phpbb.login("Foo", "pass")
+        assert phpbb._get_sid() == "s1"
+    # one check, then logout on exit
+    assert board.calls == [("GET", None), ("POST", "logout")]
+    assert store.load("http://dummy.io|Foo") is None
+
+
+@pytest.mark.asyncio
+async def test_login_when_stored_session_expired(store):
+    board = Board()
+    async with make_phpbb(board, store, logout_on_exit=False) as phpbb:
+        await phpbb.login("Foo", "pass")
+    board.valid_sids.clear()  # session expired on the board
+
+    board.calls.clear()
+    async with make_phpbb(board, store, logout_on_exit=False) as phpbb:
+        assert await phpbb.login("Foo", "pass")
+    assert board.calls == [("GET", None), ("GET", None), ("POST", "login")]
@@ -0,0 +1,53 @@
+"""Tests of the username -> UID cache, and of its use by `PhpBB`."""
+
+import time
+
+import pytest
+
+from pyphpbb_sl.fakeboard import FakeBoard
+from pyphpbb_sl.uids import UIDCache
+
+
+def test_lru_ttl_and_case(monkeypatch):
+    cache = UIDCache(maxsize=2, ttl=10)
+    cache.put("Foo", 2)
+    cache.put("Bar", 3)
+    assert cache.get("FOO") == 2
+    cache.put("Baz", 4)  # evicts Bar, the least recently used
+    assert "bar" not in cache and len(cache) == 2
+
+    now = time.time()
+    monkeypatch.setattr("pyphpbb_sl.uids.time.time", lambda: now + 11)
+    assert cache.get("Foo") is None and len(cache) == 1
+
+
+def test_persistence(tmp_path):
+    path = tmp_path / "uids.json"
+    cache = UIDCache(path=path)
+    cache.update({"Foo": 2, "Bar": 3})
+    cache.save()
+    assert UIDCache(path=path).get("bar") == 3
+    assert UIDCache(maxsize=1, path=path).get("Foo") is None  # keeps the newest
+    assert len(UIDCache(path=tmp_path / "missing.json")) == 0
+
+
+@pytest.mark.asyncio
+async def test_uids_learnt_and_used(connect):
+    board = FakeBoard()
+    uids = {name: board.add_user(name, "pass").uid for name in ("Foo", "Bar", "Baz")}
+    board.send_pm("Baz", ["Foo"], "Hi", "...")
+
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        await phpbb.fetch_unread_messages()
+        assert phpbb.uid_cache.get("baz") == uids["Baz"]  # from the sender link
+
+        before = board.requests
+        assert await phpbb.send_private_message("Baz", "Re: Hi", "...")
+        assert board.requests - before == 2  # compose form GET and send POST only
+        assert await phpbb.get_member_uid("Baz") == uids["Baz"]
+        assert board.requests - before == 2
+
+        phpbb.uid_cache.put("Bar", 999)  # stale: refused, resolved again
+        assert await phpbb.send_private_message("Bar", "Hello", "...")
+        assert phpbb.uid_cache.get("Bar") == uids["Bar"]
@@ -0,0 +1,79 @@
+"""Tests of `UnreadWatcher` against the local `FakeBoard`."""
+
+import asyncio
+
+import pytest
+
+from pyphpbb_sl import UnreadWatcher
+from pyphpbb_sl.cache import HTTPCache
+from pyphpbb_sl.models import Message
+
+
+@pytest.mark.asyncio
+async def test_poll_dispatches_new_unread(board, connect):
+    board.send_pm("Bar", ["Foo"], "Already there", "...")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        queue: asyncio.Queue[Message] = asyncio.Queue()
+        watcher = UnreadWatcher(phpbb, queue=queue)
+        assert phpbb.browser.cache is None  # the session is left as is
+        seen = []
+
+        @watcher.on_message
+        async def record(message):
+            seen.append(message.subject)
+
+        assert [m.subject for m in await watcher.poll()] == ["Already there"]
+        assert await watcher.poll() == []
+
+        board.send_pm("Bar", ["Foo"], "First", "...")
+        board.send_pm("Bar", ["Foo"], "Second", "...")
+        await watcher.poll()
+        assert seen == ["Already there", "First", "Second"]
+        assert queue.qsize() == 3
+
+
+@pytest.mark.asyncio
+async def test_run_adapts_interval(board, connect):
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        watcher = UnreadWatcher(phpbb, min_interval=0.01, max_interval=0.04, backoff=2)
+
+        @watcher.on_message
+        async def stop(message):
+            watcher.stop()
+
+        await watcher.run(timeout=0.2)
+        assert watcher.interval == 0.04  # idle: backed off up to the max
+
+        board.send_pm("Bar", ["Foo"], "Wake up", "...")
+        await asyncio.wait_for(watcher.run(), 1)
+        assert watcher.interval == 0.01
+
+
+@pytest.mark.asyncio
+async def test_poll_cache(board, connect):
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        cache = HTTPCache(rules={r"ucp\.php": 60})
+        watcher = UnreadWatcher(phpbb, cache=cache)
+        await watcher.poll()
+        before = board.requests
+        await watcher.poll()
+        assert board.requests == before  # inbox page served by the watcher cache
+        assert phpbb.browser.cache is None and len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_own_cursor(board, connect):
+    board.send_pm("Bar", ["Foo"], "One", "...")
+    async with connect(board) as phpbb:
+        await phpbb.login("Foo", "pass")
+        watcher = UnreadWatcher(phpbb)
+        assert [m.subject for m in await watcher.poll()] == ["One"]
+        assert [m.subject for m in await phpbb.sync_box()] == ["One"]  # not hidden
+
+        board.send_pm("Bar", ["Foo"], "Two", "...")
+        assert [m.subject for m in await phpbb.sync_box()] == ["Two"]
+        assert [m.subject for m in await watcher.poll()] == ["Two"]
+        assert await watcher.poll() == []